@@ -0,0 +1,22 @@
+# app_config.py
+# Lecture de config.ini (application, dépôts, options [Git] et [Dependencies]).
+# - Séparé de provisioning_engine.py : l'installateur lit config.ini dès son démarrage, le moteur d'installation
+#   (et ses modules : Chocolatey, PostgreSQL, Django...) n'est importé qu'au lancement de l'installation.
+
+import os
+
+def load_app_config(path="config.ini"):
+    import configparser
+    from git_sync import read_git_options
+    from dependency_cache import read_dependency_options
+    parser = configparser.ConfigParser()
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Le fichier '{path}' est manquant à côté du script.")
+    parser.read(path, encoding="utf-8")
+    return {
+        'app_name': parser.get('Application', 'name', fallback="Application sans nom"),
+        'backend_url': parser.get('Repositories', 'backend_url'),
+        'frontend_url': parser.get('Repositories', 'frontend_url'),
+        **read_git_options(parser),
+        **read_dependency_options(parser),
+    }
@@ -0,0 +1,108 @@
+# backend_server.py
+# Backend en plusieurs processus Waitress partageant le même port (moteur "processes" du lanceur).
+# - Lancé avec le python du venv, depuis le dossier backend (celui de manage.py).
+# - Le processus principal ouvre le socket d'écoute puis démarre --workers processus (multiprocessing, méthode
+#   "spawn" : identique sous Windows et ailleurs) qui acceptent tous sur ce socket ; le système répartit les connexions.
+# - Chaque worker a son fichier .pid (« PID IDENTITÉ », comme ceux du lanceur) et son log : backend-worker-N.pid/.log.
+# - Un worker qui s'arrête est relancé ; l'arrêt du processus principal (taskkill /T) arrête tous les workers.
+# - Disponibilité : le socket n'écoute qu'une fois l'application chargée par un premier worker (un port ouvert
+#   signifie donc une application importable) ; quand tous les workers l'ont chargée, READY_MARKER est écrit
+#   dans le log du processus principal (attendu par service_probes pour ce moteur).
+#
+# Utilisation :
+#   venv\Scripts\python.exe backend_server.py --port 8000 --workers 4 --threads 4 --pid-dir ..\.pids --log-dir ..\logs core.wsgi:application
+
+import os
+import sys
+import time
+
+WORKER_PREFIX = "backend-worker-"
+READY_MARKER = "BOVO_BACKEND_READY"
+
+def serve_worker(sock, app_spec, options, log_path, cwd, index, ready):
+    # Point d'entrée d'un worker (processus enfant)
+    import importlib
+    log = open(log_path, "a", buffering=1, encoding="utf-8", errors="replace")
+    sys.stdout = sys.stderr = log
+    os.chdir(cwd); sys.path.insert(0, cwd)
+    module, _, attribute = app_spec.partition(":")
+    application = getattr(importlib.import_module(module), attribute or "application")
+    from waitress import serve
+    ready.put(index)
+    serve(application, sockets=[sock], **options)
+
+def worker_files(pid_dir, log_dir, index):
+    return os.path.join(pid_dir, f"{WORKER_PREFIX}{index}.pid"), os.path.join(log_dir, f"{WORKER_PREFIX}{index}.log")
+
+def remove_worker_files(pid_dir):
+    # Fichiers .pid de workers laissés par une exécution précédente
+    for name in os.listdir(pid_dir):
+        if name.startswith(WORKER_PREFIX) and name.endswith(".pid"):
+            try: os.remove(os.path.join(pid_dir, name))
+            except OSError: pass
+
+def main(argv=None):
+    import argparse
+    import queue
+    import signal
+    import socket
+    import multiprocessing
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from process_state import process_identity
+    parser = argparse.ArgumentParser(description="Backend Waitress en plusieurs processus.")
+    parser.add_argument("app", help="Application WSGI, ex. core.wsgi:application")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--connection-limit", type=int, default=100)
+    parser.add_argument("--backlog", type=int, default=1024)
+    parser.add_argument("--channel-timeout", type=int, default=120)
+    parser.add_argument("--pid-dir", required=True)
+    parser.add_argument("--log-dir", required=True)
+    args = parser.parse_args(argv)
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    if os.name != "nt": sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1) # Sous Windows, autoriserait un second serveur sur le même port
+    sock.bind((args.host, args.port)) # listen() après le chargement de l'application par un premier worker
+    options = {"threads": args.threads, "connection_limit": args.connection_limit, "backlog": args.backlog, "channel_timeout": args.channel_timeout}
+    context = multiprocessing.get_context("spawn")
+    ready = context.Queue()
+    os.makedirs(args.pid_dir, exist_ok=True); os.makedirs(args.log_dir, exist_ok=True)
+    remove_worker_files(args.pid_dir)
+
+    def start_worker(index):
+        pid_path, log_path = worker_files(args.pid_dir, args.log_dir, index)
+        process = context.Process(target=serve_worker, args=(sock, args.app, options, log_path, os.getcwd(), index, ready), daemon=True)
+        process.start()
+        with open(pid_path, "w") as f: f.write(f"{process.pid} {process_identity(process.pid) or ''}".strip())
+        print(f"Worker {index} démarré (PID {process.pid}), log : {log_path}", flush=True)
+        return process
+
+    print(f"Backend sur {args.host}:{args.port} : {args.workers} processus x {args.threads} threads", flush=True)
+    workers = {index: start_worker(index) for index in range(1, args.workers + 1)}
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    loaded, listening, announced = set(), False, False
+    try:
+        while True:
+            try:
+                loaded.add(ready.get(timeout=1))
+                while True: loaded.add(ready.get_nowait())
+            except queue.Empty: pass
+            if loaded and not listening:
+                sock.listen(args.backlog); listening = True
+            if len(loaded) >= len(workers) and not announced:
+                print(f"{READY_MARKER} : application chargée par {len(loaded)} worker(s)", flush=True); announced = True
+            for index, process in list(workers.items()):
+                if not process.is_alive():
+                    print(f"Worker {index} arrêté (code {process.exitcode}), redémarrage", flush=True)
+                    time.sleep(1) # Évite une boucle de redémarrage rapide si l'application ne se charge pas
+                    workers[index] = start_worker(index)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in workers.values(): process.terminate()
+        remove_worker_files(args.pid_dir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+# choco_tools.py
+# Outils Chocolatey sans interface graphique, utilisés par install_prereqs_gui.py.
+# - Inventaire des paquets installés (dossier lib de Chocolatey + sondes de version des exécutables).
+# - Comparaison avec l'état souhaité : seuls les paquets absents ou trop anciens sont envoyés à choco.
+# - Analyse du résultat par paquet dans la sortie de choco.
+# - Cache local de paquets (.nupkg + manifest.json) pour les installations hors ligne.
+
+import os
+import re
+import shutil
+import subprocess
+
+# =============================================================================
+# Analyse de la sortie de Chocolatey
+# =============================================================================
+CHOCO_RESULT_PATTERNS = [
+    (re.compile(r"The (?:install|upgrade) of ([\w.\-]+) was (NOT )?successful", re.IGNORECASE), lambda m: m.group(2) is None),
+    (re.compile(r"^\s*([\w.\-]+) v\S+ (?:already installed|is the latest version available)", re.IGNORECASE), lambda m: True),
+]
+
+def parse_choco_result(line):
+    # Retourne (paquet, succès) si la ligne annonce le résultat d'un paquet, sinon None
+    for pattern, is_success in CHOCO_RESULT_PATTERNS:
+        match = pattern.search(line)
+        if match: return match.group(1).lower(), is_success(match)
+    return None
+
+# =============================================================================
+# État souhaité : paquet Chocolatey -> version minimale et sonde de l'exécutable
+# =============================================================================
+DESIRED_PACKAGES = {
+    "git": {"min_version": "2.40", "probe": ["git", "--version"]},
+    "python": {"min_version": "3.10", "probe": ["python", "--version"]},
+    "nodejs-lts": {"min_version": "18.0", "probe": ["node", "--version"]},
+    "vscode": {"min_version": "1.80", "probe": ["code", "--version"]},
+    "postgresql14": {"min_version": "14.0", "probe": ["psql", "--version"]},
+}
+
+VERSION_PATTERN = re.compile(r"(\d+(?:\.\d+)+)")
+
+def parse_version(text):
+    match = VERSION_PATTERN.search(text or "")
+    return tuple(int(part) for part in match.group(1).split(".")) if match else None
+
+def version_at_least(version, minimum):
+    parsed, wanted = parse_version(version), parse_version(minimum)
+    if parsed is None: return False
+    if wanted is None: return True
+    width = max(len(parsed), len(wanted))
+    return parsed + (0,) * (width - len(parsed)) >= wanted + (0,) * (width - len(wanted))
+
+# =============================================================================
+# Instantané de l'existant
+# =============================================================================
+def choco_lib_dir():
+    root = os.environ.get("ChocolateyInstall") or os.path.join(os.environ.get("ProgramData", r"C:\ProgramData"), "chocolatey")
+    return os.path.join(root, "lib")
+
+def choco_list_inventory(timeout=60):
+    # Repli : un seul `choco list` local (--local-only pour Chocolatey 1.x ; option supprimée, et refusée, en 2.x)
+    executable = shutil.which("choco")
+    if not executable: return {}
+    for options in (["--local-only"], []):
+        try:
+            result = subprocess.run([executable, "list", "--limit-output", *options], capture_output=True, text=True, errors="replace",
+                                    timeout=timeout, creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0))
+        except (OSError, subprocess.SubprocessError): return {}
+        if result.returncode == 0:
+            return {name.strip().lower(): version.strip() for name, _, version in (line.partition("|") for line in result.stdout.splitlines()) if version}
+    return {}
+
+def choco_lib_inventory(lib_dir=None):
+    # Lit le dossier lib sans démarrer choco (plusieurs secondes par appel) : un .nuspec par paquet installé.
+    # C'est là que `choco list` lit lui-même les paquets installés, mais cette organisation n'est pas documentée :
+    # si le dossier est absent ($env:ChocolateyInstall déplacé, future version de Chocolatey), on revient à un
+    # seul `choco list`. Un paquet non reconnu est au pire réinstallé (`choco upgrade` est sans effet s'il est à jour).
+    lib_dir = lib_dir or choco_lib_dir()
+    packages = {}
+    try: entries = os.listdir(lib_dir)
+    except OSError: return choco_list_inventory() if lib_dir == choco_lib_dir() else packages
+    for name in entries:
+        nuspec = os.path.join(lib_dir, name, f"{name}.nuspec")
+        try:
+            with open(nuspec, "r", encoding="utf-8", errors="replace") as f:
+                match = re.search(r"<version>\s*([^<\s]+)\s*</version>", f.read())
+        except OSError: continue
+        if match: packages[name.lower()] = match.group(1)
+    return packages
+
+def probe_version(command, timeout=10):
+    executable = shutil.which(command[0])
+    if not executable: return None
+    try:
+        output = subprocess.run([executable] + command[1:], capture_output=True, text=True, errors="replace", timeout=timeout,
+                                creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0)).stdout
+    except (OSError, subprocess.SubprocessError): return None
+    version = parse_version(output)
+    return ".".join(str(part) for part in version) if version else None
+
+def take_inventory(packages, desired=DESIRED_PACKAGES, lib_dir=None):
+    # Un seul passage sur le dossier lib + les sondes de version lancées en parallèle
+    from concurrent.futures import ThreadPoolExecutor
+    installed = choco_lib_inventory(lib_dir)
+    probes = {name: desired[name]["probe"] for name in packages if name in desired and desired[name].get("probe")}
+    with ThreadPoolExecutor(max_workers=max(1, len(probes))) as pool:
+        probed = dict(zip(probes, pool.map(probe_version, probes.values())))
+    return {"choco": installed, "probes": probed}
+
+def plan_packages(packages, inventory, desired=DESIRED_PACKAGES):
+    # Retourne [(paquet, action, version installée)] avec action parmi "ok", "install", "upgrade"
+    plan = []
+    for name in packages:
+        minimum = desired.get(name, {}).get("min_version")
+        choco_version = inventory["choco"].get(name.lower())
+        probed_version = inventory["probes"].get(name)
+        if choco_version and version_at_least(choco_version, minimum):
+            plan.append((name, "ok", choco_version))
+        elif probed_version and version_at_least(probed_version, minimum):
+            plan.append((name, "ok", probed_version))
+        elif choco_version:
+            plan.append((name, "upgrade", choco_version))
+        else:
+            plan.append((name, "install", probed_version))
+    return plan
+
+# =============================================================================
+# Cache local de paquets (préparation en ligne, installation hors ligne)
+# =============================================================================
+COMMUNITY_FEED = "https://community.chocolatey.org/api/v2/"
+BOOTSTRAP_URL = "https://community.chocolatey.org/install.ps1"
+PREFETCH_PACKAGES = ["chocolatey", "git", "python", "nodejs-lts", "vscode", "postgresql14"]
+MANIFEST_NAME = "manifest.json"
+EMBEDDED_EXTENSIONS = (".exe", ".msi", ".zip", ".7z")
+
+def fetch_url(url, timeout=60):
+    import urllib.request
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return response.read()
+
+def fetch_package(feed, package_id, version=None, fetch=fetch_url):
+    # `feed` est une URL de flux NuGet v2 ou un dossier contenant des .nupkg (miroir, cache existant, tests)
+    if os.path.isdir(feed):
+        candidates = []
+        for name in os.listdir(feed):
+            if name.lower().startswith(package_id.lower() + ".") and name.lower().endswith(".nupkg"):
+                candidate_version = name[len(package_id) + 1:-len(".nupkg")]
+                if candidate_version[:1].isdigit(): candidates.append((parse_version(candidate_version) or (), candidate_version, name))
+        if version: candidates = [c for c in candidates if c[1] == version]
+        if not candidates: raise FileNotFoundError(f"Paquet '{package_id}' introuvable dans {feed}")
+        with open(os.path.join(feed, max(candidates)[2]), "rb") as f: return f.read()
+    url = f"{feed.rstrip('/')}/package/{package_id}" + (f"/{version}" if version else "")
+    return fetch(url)
+
+def read_nupkg(data):
+    # Retourne (id, version, dépendances [(id, version exacte ou None)], téléchargement à l'installation ?)
+    import io
+    import zipfile
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        names = archive.namelist()
+        nuspec = next(name for name in names if name.endswith(".nuspec") and "/" not in name)
+        content = archive.read(nuspec).decode("utf-8", "replace")
+    package_id = re.search(r"<id>\s*([^<\s]+)\s*</id>", content).group(1)
+    version = re.search(r"<version>\s*([^<\s]+)\s*</version>", content).group(1)
+    dependencies = []
+    for dep_id, dep_range in re.findall(r'<dependency\s+id="([^"]+)"(?:\s+version="([^"]*)")?', content):
+        exact = re.fullmatch(r"\[([^,\]]+)\]", dep_range or "")
+        dependencies.append((dep_id, exact.group(1) if exact else None))
+    # Un script d'installation sans binaire embarqué va chercher l'installeur sur Internet au moment de l'installation
+    lowered = [name.lower() for name in names]
+    has_script = "tools/chocolateyinstall.ps1" in lowered
+    embedded = any(name.startswith("tools/") and name.endswith(EMBEDDED_EXTENSIONS) for name in lowered)
+    return package_id, version, dependencies, has_script and not embedded
+
+def prefetch_packages(cache_dir, packages=PREFETCH_PACKAGES, feed=COMMUNITY_FEED, bootstrap_url=BOOTSTRAP_URL, fetch=fetch_url, log=print, max_workers=4):
+    import hashlib
+    import json
+    from datetime import datetime
+    from concurrent.futures import ThreadPoolExecutor
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest = {"created": datetime.now().isoformat(timespec="seconds"), "feed": feed, "packages": {}}
+
+    def store(name, data):
+        with open(os.path.join(cache_dir, name), "wb") as f: f.write(data)
+        return {"file": name, "sha256": hashlib.sha256(data).hexdigest()}
+
+    if bootstrap_url:
+        manifest["bootstrap"] = store("install.ps1", fetch(bootstrap_url))
+        log("Script d'installation de Chocolatey téléchargé.")
+
+    # Parcours en largeur des dépendances ; chaque niveau est téléchargé en parallèle
+    wanted, seen = [(package, None) for package in packages], set()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while wanted:
+            level = [item for item in wanted if item[0].lower() not in seen]
+            seen.update(package.lower() for package, _ in level)
+            wanted = []
+            for (requested, version), data in zip(level, pool.map(lambda item: fetch_package(feed, item[0], item[1], fetch), level)):
+                package_id, package_version, dependencies, downloads = read_nupkg(data)
+                entry = store(f"{package_id.lower()}.{package_version}.nupkg", data)
+                entry.update({"id": package_id, "version": package_version, "dependencies": [d for d, _ in dependencies], "downloads_at_install": downloads})
+                manifest["packages"][package_id.lower()] = entry
+                log(f"{package_id} {package_version} mis en cache" + (" (l'installeur sera téléchargé à l'installation)" if downloads else ""))
+                wanted.extend(dependencies)
+
+    with open(os.path.join(cache_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def check_manifest(manifest):
+    # Entrées indispensables à une installation hors ligne (amorçage de Chocolatey compris) ; ValueError sinon
+    if not isinstance(manifest.get("packages"), dict): raise ValueError(f"{MANIFEST_NAME} : liste des paquets absente.")
+    if "chocolatey" not in manifest["packages"]: raise ValueError(f"{MANIFEST_NAME} : le paquet 'chocolatey' n'est pas dans le cache. Préparez à nouveau le cache.")
+    if "bootstrap" not in manifest: raise ValueError(f"{MANIFEST_NAME} : le script d'installation de Chocolatey (install.ps1) n'est pas dans le cache. Préparez à nouveau le cache.")
+    for name, entry in list(manifest["packages"].items()) + [("bootstrap", manifest["bootstrap"])]:
+        if not isinstance(entry, dict) or not entry.get("file") or not entry.get("sha256"):
+            raise ValueError(f"{MANIFEST_NAME} : entrée '{name}' incomplète (fichier ou empreinte manquant).")
+
+def load_manifest(cache_dir, verify=True):
+    import hashlib
+    import json
+    with open(os.path.join(cache_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    check_manifest(manifest)
+    if verify:
+        for entry in list(manifest["packages"].values()) + [manifest["bootstrap"]]:
+            with open(os.path.join(cache_dir, entry["file"]), "rb") as f:
+                if hashlib.sha256(f.read()).hexdigest() != entry["sha256"]:
+                    raise ValueError(f"Fichier corrompu dans le cache : {entry['file']}")
+    return manifest
+
+def ps_quote(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+def local_source_option(cache_dir):
+    return f" --source={ps_quote(os.path.abspath(cache_dir))}" if cache_dir else ""
+
+def local_bootstrap_command(cache_dir):
+    # install.ps1 utilise $env:chocolateyDownloadUrl à la place du téléchargement du paquet chocolatey
+    manifest = load_manifest(cache_dir, verify=False)
+    nupkg = os.path.abspath(os.path.join(cache_dir, manifest["packages"]["chocolatey"]["file"]))
+    script = os.path.abspath(os.path.join(cache_dir, manifest["bootstrap"]["file"]))
+    return (f"Set-ExecutionPolicy Bypass -Scope Process -Force; "
+            f"$env:chocolateyDownloadUrl = {ps_quote(nupkg)}; "
+            f"& {ps_quote(script)}")
+
+# =============================================================================
+# Point d'entrée : préparation d'un cache sur une machine connectée
+#   python choco_tools.py prefetch <dossier> [--feed URL_OU_DOSSIER] [paquet ...]
+# =============================================================================
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Prépare un cache local de paquets Chocolatey pour une installation hors ligne.")
+    sub = parser.add_subparsers(dest="action", required=True)
+    prefetch = sub.add_parser("prefetch")
+    prefetch.add_argument("cache_dir")
+    prefetch.add_argument("packages", nargs="*", default=PREFETCH_PACKAGES)
+    prefetch.add_argument("--feed", default=COMMUNITY_FEED)
+    args = parser.parse_args()
+    prefetch_packages(args.cache_dir, args.packages, feed=args.feed)
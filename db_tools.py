@@ -0,0 +1,205 @@
+# db_tools.py
+# Outils PostgreSQL sans interface graphique.
+# - Provisionnement idempotent des rôles, bases et droits, en une seule session :
+#   via le pilote psycopg2 s'il est disponible, sinon via un unique processus psql exécutant un script.
+# - Plusieurs couples base/rôle peuvent être provisionnés en une passe (prod, staging, test...).
+# - Pré-vérification des performances : latence et réglages du serveur comparés aux besoins des services.
+
+import os
+import re
+import glob
+import shutil
+import importlib.util
+
+def quote_ident(name):
+    return '"' + name.replace('"', '""') + '"'
+
+def quote_literal(value):
+    return "'" + value.replace("'", "''") + "'"
+
+def split_list(value):
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+# =============================================================================
+# Cibles : "base1, base2" + "role" (ou "role1, role2") -> une cible par base
+# =============================================================================
+def build_targets(db_names, db_users, db_pass):
+    names, users = split_list(db_names), split_list(db_users)
+    if not names or not users:
+        raise ValueError("Au moins une base et un utilisateur sont requis.")
+    if len(users) == 1: users = users * len(names)
+    if len(users) != len(names):
+        raise ValueError("Indiquez un seul utilisateur, ou autant d'utilisateurs que de bases.")
+    return [{"db_name": name, "db_user": user, "db_pass": db_pass} for name, user in zip(names, users)]
+
+def provisioning_steps(targets):
+    # Liste ordonnée de (description, requête d'existence ou None, instruction) ; chaque rôle n'apparaît qu'une fois
+    steps, seen_roles = [], set()
+    for target in targets:
+        user, name = target["db_user"], target["db_name"]
+        if user not in seen_roles:
+            seen_roles.add(user)
+            steps.append((f"Rôle {user}", f"SELECT 1 FROM pg_catalog.pg_roles WHERE rolname = {quote_literal(user)}",
+                          f"CREATE ROLE {quote_ident(user)} LOGIN PASSWORD {quote_literal(target['db_pass'])}"))
+        steps.append((f"Base {name}", f"SELECT 1 FROM pg_catalog.pg_database WHERE datname = {quote_literal(name)}",
+                      f"CREATE DATABASE {quote_ident(name)} OWNER {quote_ident(user)}"))
+        steps.append((f"Droits de {user} sur {name}", None, f"GRANT ALL PRIVILEGES ON DATABASE {quote_ident(name)} TO {quote_ident(user)}"))
+    return steps
+
+# =============================================================================
+# Exécution via le pilote Python (une connexion, aucun processus)
+# =============================================================================
+def has_driver():
+    return importlib.util.find_spec("psycopg2") is not None
+
+def provision_with_driver(targets, admin_password, host="localhost", port=5432, admin_user="postgres", log=print):
+    import psycopg2
+    conn = psycopg2.connect(dbname="postgres", user=admin_user, password=admin_password, host=host, port=port, connect_timeout=10)
+    try:
+        conn.autocommit = True # CREATE DATABASE ne peut pas s'exécuter dans une transaction
+        with conn.cursor() as cursor:
+            for description, check_sql, statement in provisioning_steps(targets):
+                if check_sql:
+                    cursor.execute(check_sql)
+                    if cursor.fetchone():
+                        log(f"{description} : existe déjà."); continue
+                cursor.execute(statement)
+                log(f"{description} : OK.")
+    finally:
+        conn.close()
+
+# =============================================================================
+# Repli : un seul processus psql et un script idempotent
+# =============================================================================
+def build_psql_script(targets):
+    lines = ["\\set ON_ERROR_STOP on", "\\encoding UTF8"]
+    for description, check_sql, statement in provisioning_steps(targets):
+        lines.append(f"\\echo {description}")
+        if check_sql is None:
+            lines.append(f"{statement};")
+        elif statement.startswith("CREATE DATABASE"):
+            # CREATE DATABASE est interdit dans un bloc DO : \gexec n'exécute la commande que si elle est sélectionnée
+            lines.append(f"SELECT {quote_literal(statement)} WHERE NOT EXISTS ({check_sql})\\gexec")
+        else:
+            lines.append(f"DO $bovo$ BEGIN IF NOT EXISTS ({check_sql}) THEN {statement}; END IF; END $bovo$;")
+    return "\n".join(lines) + "\n"
+
+def find_psql():
+    found = shutil.which("psql")
+    if found: return found
+    candidates = glob.glob(os.path.join(os.environ.get("ProgramFiles", r"C:\Program Files"), "PostgreSQL", "*", "bin", "psql.exe"))
+    return max(candidates) if candidates else "psql"
+
+# =============================================================================
+# Pré-vérification des performances (page de configuration de l'installateur)
+# =============================================================================
+PREFLIGHT_SETTINGS = ["max_connections", "superuser_reserved_connections", "shared_buffers", "work_mem", "synchronous_commit", "server_version_num"]
+MIN_SERVER_VERSION = 120000       # Django 4.2 exige PostgreSQL 12 ou plus
+DEFAULT_SHARED_BUFFERS = 128 * 1024 * 1024
+SLOW_CONNECT_MS = 100
+SLOW_ROUND_TRIP_MS = 5
+CONNECTIONS_FLAG = "Connexions disponibles"
+
+def setting_bytes(setting, unit):
+    # pg_settings exprime les tailles en multiples de `unit` ("8kB", "kB", "MB"...)
+    match = re.fullmatch(r"(\d*)\s*(B|kB|MB|GB|TB)", unit or "")
+    if not match: return None
+    factor = {"B": 1, "kB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3, "TB": 1024 ** 4}[match.group(2)]
+    return int(setting) * int(match.group(1) or 1) * factor
+
+def format_server_version(version):
+    # server_version_num : 120015 -> "12.15" ; avant la version 10, majeure en deux parties : 90624 -> "9.6.24"
+    if version >= 100000: return f"{version // 10000}.{version % 100}"
+    return f"{version // 10000}.{version // 100 % 100}.{version % 100}"
+
+def format_bytes(value):
+    for unit in ["o", "Ko", "Mo", "Go"]:
+        if value < 1024 or unit == "Go": return f"{value:.0f} {unit}" if unit == "o" else f"{value:.1f} {unit}"
+        value /= 1024
+
+def planned_connections(profile=None):
+    # Connexions simultanées dont les services auront besoin, détaillées (calcul : tuning_profile.connections_needed).
+    # Sans profil : celui que l'installateur propose pour cette machine.
+    from tuning_profile import BEAT_CONNECTIONS, RESERVED_CONNECTIONS, detect_hardware, build_profile, web_connections, connections_needed
+    profile = profile or build_profile(**detect_hardware())
+    return {"waitress": web_connections(profile), "celery": profile["CELERY_WORKER_CONCURRENCY"], "beat": BEAT_CONNECTIONS,
+            "reserve": RESERVED_CONNECTIONS, "total": connections_needed(profile)}
+
+def db_preflight(host, port, dbname, user, password, plan=None, burst=50):
+    # Mesure la latence (connexion, aller-retour) et compare les réglages du serveur aux besoins des services.
+    # Retourne un rapport ; lève l'exception du pilote si la connexion échoue.
+    import time
+    import psycopg2
+    plan = plan or planned_connections()
+    report = {"plan": plan, "flags": []}
+    def flag(level, message): report["flags"].append((level, message))
+
+    connect_times = []
+    for _ in range(3):
+        started = time.perf_counter()
+        conn = psycopg2.connect(dbname=dbname, user=user, password=password, host=host, port=port, connect_timeout=3)
+        connect_times.append((time.perf_counter() - started) * 1000)
+        if len(connect_times) < 3: conn.close()
+    try:
+        with conn.cursor() as cursor:
+            round_trips = []
+            for _ in range(burst):
+                started = time.perf_counter()
+                cursor.execute("SELECT 1"); cursor.fetchone()
+                round_trips.append((time.perf_counter() - started) * 1000)
+            cursor.execute("SELECT name, setting, unit FROM pg_catalog.pg_settings WHERE name = ANY(%s)", (PREFLIGHT_SETTINGS,))
+            settings = {name: (setting, unit) for name, setting, unit in cursor.fetchall()}
+            cursor.execute("SELECT count(*) FROM pg_catalog.pg_stat_activity WHERE backend_type = 'client backend' AND pid <> pg_backend_pid()")
+            other_connections = cursor.fetchone()[0]
+    finally:
+        conn.close()
+
+    connect_times.sort(); round_trips.sort()
+    report["connect_ms"] = round(connect_times[len(connect_times) // 2], 1)
+    report["round_trip_ms"] = round(round_trips[len(round_trips) // 2], 2)
+    report["round_trip_p95_ms"] = round(round_trips[min(len(round_trips) - 1, int(len(round_trips) * 0.95))], 2)
+    report["other_connections"] = other_connections
+    report["settings"] = {name: value for name, (value, _) in settings.items()}
+
+    version = int(settings["server_version_num"][0])
+    report["server_version"] = format_server_version(version)
+    if version < MIN_SERVER_VERSION: flag("error", f"PostgreSQL {report['server_version']} : version 12 ou plus requise.")
+
+    report["available_connections"] = int(settings["max_connections"][0]) - int(settings["superuser_reserved_connections"][0]) - other_connections
+    check_connections(report, plan)
+
+    shared_buffers = setting_bytes(*settings["shared_buffers"])
+    if shared_buffers is not None and shared_buffers <= DEFAULT_SHARED_BUFFERS:
+        flag("warning", f"shared_buffers = {format_bytes(shared_buffers)} (valeur par défaut) : viser environ 25 % de la RAM du serveur.")
+    work_mem = setting_bytes(*settings["work_mem"])
+    if work_mem is not None and work_mem < 4 * 1024 * 1024:
+        flag("warning", f"work_mem = {format_bytes(work_mem)} : les tris et jointures importants passeront par le disque.")
+    if settings["synchronous_commit"][0] == "off":
+        flag("warning", "synchronous_commit = off : les dernières transactions validées peuvent être perdues en cas de panne.")
+
+    if report["connect_ms"] > SLOW_CONNECT_MS:
+        flag("warning", f"Connexion lente ({report['connect_ms']} ms) : préférer des connexions persistantes (CONN_MAX_AGE).")
+    if report["round_trip_ms"] > SLOW_ROUND_TRIP_MS:
+        flag("warning", f"Aller-retour lent ({report['round_trip_ms']} ms par requête) : serveur distant ou réseau chargé.")
+    return report
+
+def check_connections(report, plan):
+    # (Re)calcule le constat sur les connexions pour `plan` : appelé de nouveau quand le profil de performance change
+    report["plan"] = plan
+    report["flags"] = [(level, message) for level, message in report["flags"] if not message.startswith(CONNECTIONS_FLAG)]
+    available = report["available_connections"]
+    if available < plan["total"]:
+        settings = report["settings"]
+        report["flags"].append(("error", f"{CONNECTIONS_FLAG} : {available} (max_connections={settings['max_connections']}, {settings['superuser_reserved_connections']} réservées, "
+                                         f"{report['other_connections']} déjà ouvertes) pour {plan['total']} nécessaires (Waitress {plan['waitress']} + "
+                                         f"Celery {plan['celery']} + beat {plan['beat']} + marge {plan['reserve']})."))
+
+def format_preflight(report):
+    lines = [f"PostgreSQL {report['server_version']}",
+             f"Connexion : {report['connect_ms']} ms   Aller-retour : {report['round_trip_ms']} ms (p95 {report['round_trip_p95_ms']} ms)",
+             f"Connexions disponibles : {report['available_connections']} / nécessaires : {report['plan']['total']}",
+             "Réglages : " + ", ".join(f"{name}={value}" for name, value in sorted(report["settings"].items()) if name != "server_version_num")]
+    if report["flags"]:
+        lines.append("")
+        lines.extend(("❌ " if level == "error" else "⚠️ ") + message for level, message in report["flags"])
+    return "\n".join(lines)
@@ -0,0 +1,170 @@
+# dependency_cache.py
+# Caches de dépendances sans interface graphique, utilisés par provisioning_engine.py.
+# - Wheelhouse : les roues (.whl) de requirements.txt sont résolues et construites une seule fois, dans un dossier
+#   identifié par le contenu de requirements.txt, la version de Python et la plateforme ; les installations
+#   suivantes se font ensuite avec `pip install --no-index --find-links` (simple décompression, aucune compilation).
+# - npm : installation exacte depuis le lockfile (`npm ci`), cache npm commun à la machine en mode prefer-offline,
+#   et étape ignorée lorsque node_modules correspond déjà au lockfile.
+#
+# Utilisation :
+#   python dependency_cache.py wheelhouse requirements.txt [--python CHEMIN] [--find-links DOSSIER] [--root DOSSIER]
+
+import os
+import subprocess
+
+NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+# =============================================================================
+# Options (section [Dependencies] de config.ini)
+# =============================================================================
+DEPENDENCY_DEFAULTS = {
+    "wheelhouse": False,         # Installe les paquets Python depuis le wheelhouse local
+    "wheelhouse_dir": "",        # Vide = default_wheelhouse_root()
+    "pip_find_links": "",        # Dossier ou index local utilisé pour construire le wheelhouse (sinon PyPI)
+    "npm_cache_dir": "",         # Vide = default_npm_cache()
+}
+
+def read_dependency_options(parser):
+    options = dict(DEPENDENCY_DEFAULTS)
+    if parser.has_section("Dependencies"):
+        section = parser["Dependencies"]
+        options["wheelhouse"] = section.getboolean("wheelhouse", fallback=False)
+        options["wheelhouse_dir"] = section.get("wheelhouse_dir", fallback="").strip()
+        options["pip_find_links"] = section.get("pip_find_links", fallback="").strip()
+        options["npm_cache_dir"] = section.get("npm_cache_dir", fallback="").strip()
+    return options
+
+def run_command(command, description=None, **kwargs):
+    subprocess.run(command, shell=True, check=True, capture_output=True, text=True, encoding="utf-8", errors="replace", creationflags=NO_WINDOW, **kwargs)
+
+def file_digest(path):
+    import hashlib
+    try:
+        with open(path, "rb") as f: return hashlib.sha256(f.read()).hexdigest()
+    except OSError: return None
+
+# =============================================================================
+# Wheelhouse Python
+# =============================================================================
+WHEELHOUSE_MARKER = "wheelhouse.json"
+
+def default_wheelhouse_root():
+    return os.environ.get("BOVO_WHEELHOUSE") or os.path.join(os.environ.get("ProgramData", os.path.expanduser("~")), "BOVO", "wheelhouse")
+
+def interpreter_tag(python_exe):
+    # Version et plateforme de l'interpréteur cible (celui du venv, pas forcément celui de l'installateur)
+    output = subprocess.run([python_exe, "-c", "import sys, sysconfig; print(sys.implementation.cache_tag, sysconfig.get_platform())"],
+                            capture_output=True, text=True, check=True, creationflags=NO_WINDOW).stdout
+    return output.strip().replace(" ", "-")
+
+def wheelhouse_path(requirements, python_exe, root=None):
+    import hashlib
+    with open(requirements, "rb") as f: digest = hashlib.sha256(f.read()).hexdigest()[:16]
+    return os.path.join(root or default_wheelhouse_root(), f"{interpreter_tag(python_exe)}-{digest}")
+
+def wheelhouse_ready(path):
+    return os.path.exists(os.path.join(path, WHEELHOUSE_MARKER))
+
+def build_wheelhouse(requirements, python_exe, root=None, find_links="", run=run_command):
+    # `run(commande, description)` : exécuteur de l'appelant (InstallEngine.execute) ; retourne le dossier du wheelhouse
+    import json
+    import shutil
+    import tempfile
+    from datetime import datetime
+    path = wheelhouse_path(requirements, python_exe, root)
+    if wheelhouse_ready(path): return path
+    # Construction dans un dossier temporaire puis renommage : un wheelhouse incomplet n'est jamais utilisé.
+    # Dossier unique (mkdtemp) : plusieurs cibles d'un même processus peuvent construire le même wheelhouse en parallèle.
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    building = tempfile.mkdtemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=os.path.dirname(path))
+    source = f' --no-index --find-links "{find_links}"' if find_links else ""
+    try:
+        run(f'"{python_exe}" -m pip wheel --disable-pip-version-check -r "{os.path.abspath(requirements)}" -w "{building}"{source}',
+            "Construction du wheelhouse Python")
+        with open(os.path.join(building, WHEELHOUSE_MARKER), "w", encoding="utf-8") as f:
+            json.dump({"created": datetime.now().isoformat(timespec="seconds"), "requirements": os.path.abspath(requirements),
+                       "wheels": sorted(name for name in os.listdir(building) if name.endswith(".whl"))}, f, indent=2)
+        try: os.replace(building, path)
+        except OSError:
+            if not wheelhouse_ready(path): raise # Sinon : construit entre-temps par une autre installation
+    finally:
+        shutil.rmtree(building, ignore_errors=True)
+    return path
+
+def requirement_count(requirements):
+    # Nombre de paquets listés directement (sert d'estimation pour la progression de pip)
+    try:
+        with open(requirements, "r", encoding="utf-8", errors="replace") as f:
+            return sum(1 for line in f if line.strip() and not line.lstrip().startswith(("#", "-")))
+    except OSError: return 0
+
+def wheelhouse_install_command(python_exe, requirements, path):
+    return f'"{python_exe}" -m pip install --disable-pip-version-check --no-index --find-links "{path}" -r "{requirements}"'
+
+# =============================================================================
+# Dépendances JavaScript (npm)
+# =============================================================================
+LOCKFILES = ("npm-shrinkwrap.json", "package-lock.json")
+NPM_STAMP = ".bovo-lockfile-hash"  # Dans node_modules : empreinte du lockfile (et de Node) de la dernière installation
+
+def default_npm_cache():
+    return os.environ.get("BOVO_NPM_CACHE") or os.path.join(os.environ.get("ProgramData", os.path.expanduser("~")), "BOVO", "npm-cache")
+
+def find_lockfile(frontend):
+    for name in LOCKFILES:
+        path = os.path.join(frontend, name)
+        if os.path.exists(path): return path
+    return None
+
+def lockfile_hash(frontend):
+    import hashlib
+    lockfile = find_lockfile(frontend)
+    if not lockfile: return None
+    digest = hashlib.sha256()
+    with open(lockfile, "rb") as f: digest.update(f.read())
+    # Les modules natifs dépendent de la version de Node
+    try: digest.update(subprocess.run("node --version", shell=True, capture_output=True, creationflags=NO_WINDOW).stdout)
+    except OSError: pass
+    return digest.hexdigest()
+
+def lockfile_package_count(frontend):
+    import json
+    lockfile = find_lockfile(frontend)
+    if not lockfile: return 0
+    try:
+        with open(lockfile, "r", encoding="utf-8") as f: data = json.load(f)
+    except (OSError, ValueError): return 0
+    # lockfileVersion 2/3 : "packages" (la racine "" exclue) ; version 1 : "dependencies"
+    return len([key for key in data.get("packages", {}) if key]) or len(data.get("dependencies", {}))
+
+def node_modules_current(frontend, expected=None):
+    expected = expected or lockfile_hash(frontend)
+    if not expected: return False
+    try:
+        with open(os.path.join(frontend, "node_modules", NPM_STAMP), "r", encoding="utf-8") as f: return f.read().strip() == expected
+    except OSError: return False
+
+def write_npm_stamp(frontend, value):
+    if value and os.path.isdir(os.path.join(frontend, "node_modules")):
+        with open(os.path.join(frontend, "node_modules", NPM_STAMP), "w", encoding="utf-8") as f: f.write(value)
+
+def npm_install_command(frontend, cache_dir=None):
+    # `npm ci` n'écrit jamais le lockfile et installe exactement l'arbre qu'il décrit ; sans lockfile, repli sur `npm install`
+    verb = "ci" if find_lockfile(frontend) else "install"
+    return f'npm {verb} --cache "{cache_dir or default_npm_cache()}" --prefer-offline --no-audit --no-fund'
+
+# =============================================================================
+# Point d'entrée : préparation d'un wheelhouse
+# =============================================================================
+if __name__ == "__main__":
+    import argparse
+    import sys
+    parser = argparse.ArgumentParser(description="Caches de dépendances utilisés par l'installateur.")
+    sub = parser.add_subparsers(dest="action", required=True)
+    wheelhouse = sub.add_parser("wheelhouse", help="Construit le wheelhouse d'un requirements.txt")
+    wheelhouse.add_argument("requirements")
+    wheelhouse.add_argument("--python", default=sys.executable, help="Interpréteur cible (ex. le python.exe du venv)")
+    wheelhouse.add_argument("--find-links", default="", help="Dossier de paquets local à utiliser à la place de PyPI")
+    wheelhouse.add_argument("--root", default=None, help=f"Dossier racine (défaut : {default_wheelhouse_root()})")
+    args = parser.parse_args()
+    print(build_wheelhouse(args.requirements, args.python, args.root, args.find_links))
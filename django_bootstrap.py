@@ -0,0 +1,79 @@
+# django_bootstrap.py
+# Exécute plusieurs commandes de gestion Django dans un seul processus (un seul démarrage de l'interpréteur
+# du venv, un seul django.setup()), au lieu d'un `python manage.py ...` par commande.
+# - Lancé avec le python du venv, depuis le dossier backend (celui de manage.py).
+# - Chaque commande est un argument : "migrate", "createsuperuser --noinput", "check --deploy"...
+#   Préfixée par "-", son échec est toléré (statut "ignored") et les suivantes s'exécutent quand même.
+# - Pour chaque commande, une ligne `BOVO_RESULT {json}` (statut, durée, fin de la sortie) est écrite sur stdout.
+#
+# Utilisation :
+#   venv\Scripts\python.exe django_bootstrap.py [--settings core.settings] [--report rapport.json] -- migrate "-check --deploy"
+#   (le séparateur -- est nécessaire pour qu'une commande tolérée sans argument, ex. "-check", ne soit pas lue comme une option)
+#
+# Ce module est aussi importé par provisioning_engine.py (bootstrap_command, RESULT_PREFIX) :
+# Django n'est importé que dans main().
+
+import os
+import sys
+import json
+import time
+
+RESULT_PREFIX = "BOVO_RESULT "
+OUTPUT_TAIL = 4000
+
+def bootstrap_command(python_exe, commands, settings=None, report=None):
+    command = [python_exe, os.path.abspath(__file__)]
+    if settings: command += ["--settings", settings]
+    if report: command += ["--report", report]
+    return command + ["--"] + list(commands)
+
+def run_commands(commands):
+    import io
+    import shlex
+    from django.core.management import call_command
+    results = []
+    for spec in commands:
+        tolerated = spec.startswith("-")
+        args = shlex.split(spec[1:] if tolerated else spec)
+        buffer = io.StringIO()
+        started = time.monotonic()
+        result = {"command": " ".join(args), "status": "ok", "error": None}
+        try:
+            call_command(*args, stdout=buffer, stderr=buffer)
+        except BaseException as e: # SystemExit compris (commandes qui appellent sys.exit)
+            if isinstance(e, KeyboardInterrupt): raise
+            result["status"] = "ignored" if tolerated else "error"
+            result["error"] = str(e) or e.__class__.__name__
+        result["duration_s"] = round(time.monotonic() - started, 3)
+        result["output"] = buffer.getvalue()[-OUTPUT_TAIL:]
+        results.append(result)
+        print(RESULT_PREFIX + json.dumps(result, ensure_ascii=False), flush=True)
+        if result["status"] == "error": break
+    return results
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Commandes de gestion Django dans un seul processus.")
+    parser.add_argument("--settings", default=None, help="Module de réglages (défaut : DJANGO_SETTINGS_MODULE ou core.settings)")
+    parser.add_argument("--report", default=None, help="Fichier JSON de rapport")
+    parser.add_argument("commands", nargs="+")
+    args = parser.parse_args(argv)
+
+    started = time.monotonic()
+    sys.path.insert(0, os.getcwd())
+    if args.settings: os.environ["DJANGO_SETTINGS_MODULE"] = args.settings
+    else: os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+    import django
+    django.setup()
+    setup_s = round(time.monotonic() - started, 3)
+
+    results = run_commands(args.commands)
+    skipped = [{"command": spec.lstrip("-"), "status": "skipped"} for spec in args.commands[len(results):]]
+    report = {"setup_s": setup_s, "duration_s": round(time.monotonic() - started, 3), "commands": results + skipped,
+              "success": all(result["status"] != "error" for result in results)}
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f: json.dump(report, f, indent=2, ensure_ascii=False)
+    return 0 if report["success"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+# git_sync.py
+# Outils Git sans interface graphique, utilisés par provisioning_engine.py.
+# - Construction des commandes de clonage / mise à jour selon la section [Git] de config.ini :
+#   profondeur (clone superficiel), clone partiel sans blobs, une seule branche ou un tag précis.
+# - Cache de miroirs nus commun à la machine (un miroir par URL) : les nouveaux dépôts de travail empruntent
+#   les objets du miroir (git clone --reference / alternates), sans les retélécharger ni les dupliquer.
+# - Les URL sont utilisées telles quelles : un dépôt nu local servi en file:// convient pour les essais.
+#
+# Utilisation :
+#   python git_sync.py report [--cache DOSSIER]
+#   python git_sync.py prune [--older-than JOURS] [--cache DOSSIER]
+
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+
+NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+# =============================================================================
+# Options de clonage (section [Git] de config.ini)
+# =============================================================================
+GIT_DEFAULTS = {
+    "git_depth": 0,              # 0 = historique complet
+    "git_filter": "",            # ex. "blob:none" : les contenus ne sont téléchargés qu'au checkout
+    "git_single_branch": False,
+    "backend_ref": "",           # Branche ou tag ; vide = branche par défaut du dépôt
+    "frontend_ref": "",
+    "git_mirror": False,         # Passe par le cache de miroirs locaux
+    "git_mirror_dir": "",        # Vide = default_mirror_dir()
+    "git_timeout": 20,           # Délai (s) de la validation des dépôts (git ls-remote)
+}
+
+def read_git_options(parser):
+    # `parser` : ConfigParser déjà chargé ; retourne un dict fusionnable dans InstallerState.config
+    options = dict(GIT_DEFAULTS)
+    if parser.has_section("Git"):
+        section = parser["Git"]
+        options["git_depth"] = section.getint("depth", fallback=0)
+        options["git_filter"] = section.get("filter", fallback="").strip()
+        options["git_single_branch"] = section.getboolean("single_branch", fallback=False)
+        options["backend_ref"] = section.get("backend_ref", fallback="").strip()
+        options["frontend_ref"] = section.get("frontend_ref", fallback="").strip()
+        options["git_mirror"] = section.getboolean("mirror", fallback=False)
+        options["git_mirror_dir"] = section.get("mirror_dir", fallback="").strip()
+        options["git_timeout"] = section.getint("timeout", fallback=20)
+    return options
+
+# =============================================================================
+# Commandes
+# =============================================================================
+def clone_command(url, path, ref="", depth=0, filter_spec="", single_branch=False, reference=""):
+    options = f" --depth {int(depth)}" if depth else ""
+    # --depth implique --single-branch : on le neutralise si toutes les branches sont demandées
+    if single_branch: options += " --single-branch"
+    elif depth: options += " --no-single-branch"
+    if filter_spec: options += f" --filter={filter_spec}"
+    if ref: options += f' --branch "{ref}"'                # Accepte aussi un tag (HEAD détachée)
+    if reference: options += f' --reference "{reference}"' # Objets empruntés au miroir (objects/info/alternates)
+    # --progress : la progression est écrite même sans terminal (lue par l'installateur)
+    return f'git clone --progress{options} "{url}" "{path}"'
+
+def update_command(path, ref=""):
+    # Un dépôt superficiel ne récupère que les nouveaux commits, un clone partiel garde son filtre (remote.origin.partialclonefilter)
+    return f'git -C "{path}" pull --ff-only' + (f' origin "{ref}"' if ref else "")
+
+def head_commit(path):
+    # SHA du commit extrait, ou None si le dossier n'est pas (encore) un dépôt
+    if not os.path.exists(os.path.join(path, ".git")): return None
+    result = subprocess.run(["git", "-C", path, "rev-parse", "HEAD"], capture_output=True, text=True, creationflags=NO_WINDOW)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+# =============================================================================
+# Validation des dépôts : références publiées (git ls-remote)
+# =============================================================================
+def _kill_tree(process):
+    if os.name == "nt": # git lance git-remote-https : tuer tout l'arbre pour libérer les tubes
+        subprocess.run(f"taskkill /F /T /PID {process.pid}", capture_output=True, creationflags=NO_WINDOW)
+    else:
+        process.kill()
+
+def ls_remote(url, timeout=20):
+    # Retourne {référence: sha} ; lève RuntimeError si le dépôt est injoignable, vide ou ne répond pas à temps
+    env = {**os.environ, "GIT_TERMINAL_PROMPT": "0"} # Jamais de demande d'identifiants bloquante
+    try:
+        process = subprocess.Popen(["git", "ls-remote", url], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, encoding="utf-8",
+                                   errors="replace", env=env, creationflags=NO_WINDOW)
+    except OSError as e:
+        raise RuntimeError(str(e))
+    try:
+        stdout, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        _kill_tree(process)
+        try: process.communicate(timeout=5)
+        except subprocess.TimeoutExpired: pass
+        raise RuntimeError(f"Aucune réponse après {timeout} s.")
+    if process.returncode != 0:
+        raise RuntimeError(strip_credentials(stderr.strip()) or f"git ls-remote a échoué (code {process.returncode}).")
+    refs = {}
+    for line in stdout.splitlines():
+        sha, _, ref = line.partition("\t")
+        if ref: refs[ref.strip()] = sha.strip()
+    if not refs: raise RuntimeError("Dépôt vide : aucune référence publiée.")
+    return refs
+
+def probe_repositories(urls, timeout=20):
+    # {nom: url} -> {nom: (références, None) ou (None, erreur)} ; les dépôts sont interrogés en parallèle
+    from concurrent.futures import ThreadPoolExecutor
+    def probe(url):
+        try: return ls_remote(url, timeout), None
+        except RuntimeError as e: return None, str(e)
+    with ThreadPoolExecutor(max_workers=max(1, len(urls))) as pool:
+        return dict(zip(urls, pool.map(probe, urls.values())))
+
+def resolve_ref(refs, ref=""):
+    # Commit d'une branche ou d'un tag (tag annoté : commit pointé) ; vide = branche par défaut (HEAD)
+    if not ref: return refs.get("HEAD")
+    for candidate in (f"refs/tags/{ref}^{{}}", f"refs/tags/{ref}", f"refs/heads/{ref}", ref):
+        if candidate in refs: return refs[candidate]
+    return None
+
+def run_command(command, description=None):
+    subprocess.run(command, shell=True, check=True, capture_output=True, text=True, encoding="utf-8", errors="replace", creationflags=NO_WINDOW)
+
+# =============================================================================
+# Cache de miroirs locaux
+# =============================================================================
+CHECKOUTS_FILE = "bovo-checkouts.txt"  # Dépôts de travail qui empruntent les objets du miroir
+_mirror_locks = {}
+_mirror_locks_guard = threading.Lock()
+
+def default_mirror_dir():
+    return os.environ.get("BOVO_GIT_MIRRORS") or os.path.join(os.environ.get("ProgramData", os.path.expanduser("~")), "BOVO", "git-mirrors")
+
+def strip_credentials(text):
+    # URL ou message de git (« fatal: unable to access 'https://<PAT>@github.com/...' ») : identifiants retirés partout
+    return re.sub(r"(\w+://)[^@/\s]+@", r"\1", text)
+
+def mirror_path(url, cache_dir=None):
+    # Clé = URL sans identifiants (avec ou sans PAT, le même miroir est utilisé)
+    import hashlib
+    clean = strip_credentials(url).rstrip("/")
+    name = re.sub(r"[^\w.\-]", "_", clean.rsplit("/", 1)[-1])[:40]
+    return os.path.join(cache_dir or default_mirror_dir(), f"{name}-{hashlib.sha1(clean.encode('utf-8')).hexdigest()[:12]}")
+
+def _mirror_lock(path):
+    with _mirror_locks_guard:
+        return _mirror_locks.setdefault(os.path.normcase(os.path.abspath(path)), threading.Lock())
+
+def update_mirror(url, cache_dir=None, run=run_command):
+    # `run(commande, description)` : exécuteur de l'appelant (InstallEngine.execute) ; retourne le chemin du miroir
+    path = mirror_path(url, cache_dir)
+    label = os.path.basename(path)
+    with _mirror_lock(path):
+        if not os.path.exists(os.path.join(path, "HEAD")):
+            os.makedirs(path, exist_ok=True)
+            # L'URL enregistrée ne contient pas le PAT ; les objets inaccessibles ne sont jamais supprimés
+            # (des dépôts de travail peuvent encore en dépendre)
+            run(f'git init --bare --quiet "{path}" && git -C "{path}" config remote.origin.url "{strip_credentials(url)}" '
+                f'&& git -C "{path}" config gc.pruneExpire never && git -C "{path}" config gc.reflogExpireUnreachable never',
+                f"Création du miroir local {label}")
+        run(f'git -C "{path}" fetch --prune --quiet "{url}" "+refs/heads/*:refs/heads/*" "+refs/tags/*:refs/tags/*"',
+            f"Mise à jour du miroir local {label}")
+    return path
+
+def register_checkout(mirror, checkout):
+    with _mirror_lock(mirror):
+        with open(os.path.join(mirror, CHECKOUTS_FILE), "a", encoding="utf-8") as f: f.write(os.path.abspath(checkout) + "\n")
+
+def _alternates_file(checkout):
+    return os.path.join(checkout, ".git", "objects", "info", "alternates")
+
+def mirror_checkouts(mirror):
+    # Dépôts de travail enregistrés qui pointent encore vers ce miroir
+    try:
+        with open(os.path.join(mirror, CHECKOUTS_FILE), "r", encoding="utf-8") as f: paths = sorted({line.strip() for line in f if line.strip()})
+    except OSError: return []
+    objects = os.path.normcase(os.path.abspath(os.path.join(mirror, "objects")))
+    checkouts = []
+    for checkout in paths:
+        try:
+            with open(_alternates_file(checkout), "r", encoding="utf-8") as f:
+                if any(os.path.normcase(os.path.abspath(line.strip())) == objects for line in f): checkouts.append(checkout)
+        except OSError: pass
+    return checkouts
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try: total += os.path.getsize(os.path.join(root, name))
+            except OSError: pass
+    return total
+
+def mirror_report(cache_dir=None):
+    cache_dir = cache_dir or default_mirror_dir()
+    try: names = sorted(os.listdir(cache_dir))
+    except OSError: return []
+    report = []
+    for name in names:
+        path = os.path.join(cache_dir, name)
+        if not os.path.exists(os.path.join(path, "HEAD")): continue
+        url = subprocess.run(["git", "-C", path, "config", "--get", "remote.origin.url"], capture_output=True, text=True, creationflags=NO_WINDOW).stdout.strip()
+        fetch_head = os.path.join(path, "FETCH_HEAD")
+        last_fetch = os.path.getmtime(fetch_head) if os.path.exists(fetch_head) else os.path.getmtime(path)
+        report.append({"path": path, "url": url, "size_bytes": _dir_size(path), "last_fetch": last_fetch, "checkouts": mirror_checkouts(path)})
+    return report
+
+def prune_mirrors(cache_dir=None, older_than_days=30, log=print):
+    # Supprime les miroirs non mis à jour depuis `older_than_days` jours.
+    # Les dépôts de travail qui en dépendent récupèrent d'abord une copie de leurs objets (équivalent de --dissociate).
+    removed = 0
+    limit = time.time() - older_than_days * 86400
+    for entry in mirror_report(cache_dir):
+        if entry["last_fetch"] > limit: continue
+        for checkout in entry["checkouts"]:
+            log(f"Dissociation de {checkout}...")
+            run_command(f'git -C "{checkout}" repack -a -d -q')
+            os.remove(_alternates_file(checkout))
+        shutil.rmtree(entry["path"])
+        removed += entry["size_bytes"]
+        log(f"Miroir supprimé : {entry['url'] or entry['path']} ({entry['size_bytes'] / 1048576:.1f} Mo)")
+    return removed
+
+# =============================================================================
+# Point d'entrée : rapport de taille et nettoyage du cache de miroirs
+# =============================================================================
+if __name__ == "__main__":
+    import argparse
+    from datetime import datetime
+    parser = argparse.ArgumentParser(description="Cache local de miroirs Git utilisé par l'installateur.")
+    parser.add_argument("--cache", default=None, help=f"Dossier du cache (défaut : {default_mirror_dir()})")
+    sub = parser.add_subparsers(dest="action", required=True)
+    sub.add_parser("report")
+    prune = sub.add_parser("prune")
+    prune.add_argument("--older-than", type=int, default=30, help="Âge minimal (jours depuis la dernière mise à jour)")
+    args = parser.parse_args()
+    if args.action == "report":
+        entries = mirror_report(args.cache)
+        for entry in entries:
+            print(f"{entry['size_bytes'] / 1048576:9.1f} Mo  {datetime.fromtimestamp(entry['last_fetch']):%Y-%m-%d %H:%M}  "
+                  f"{len(entry['checkouts'])} dépôt(s)  {entry['url'] or entry['path']}")
+        print(f"{sum(entry['size_bytes'] for entry in entries) / 1048576:9.1f} Mo  au total ({len(entries)} miroir(s))")
+    else:
+        freed = prune_mirrors(args.cache, args.older_than)
+        print(f"{freed / 1048576:.1f} Mo libérés.")
@@ -3,43 +3,55 @@
 # - Supprime le flag --force de Chocolatey pour ignorer ou mettre à jour les paquets existants.
 # - Améliore le feedback utilisateur sur le comportement de l'installation.
 
+from startup_report import StartupTimer
+STARTUP = StartupTimer("install_prereqs_gui")
+
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import subprocess
 import threading
 import os
 import sys
 import shutil
-import ctypes
 import queue
+import time
 from datetime import datetime
+from spooled_log import SpooledLog
+# Modules utilisés rarement (ctypes, uuid, base64, tempfile, winreg...) et logique des prérequis (provisioning_engine,
+# choco_tools, db_tools) : importés là où ils servent
+STARTUP.mark("imports")
 
 # =============================================================================
 # Classe pour exécuter les commandes et logger la sortie
 # =============================================================================
 class CommandRunner:
-    def __init__(self, command, log_widget, on_complete=None):
+    # Intervalle de scrutation adaptatif (ms) et budget de temps par tick (s)
+    POLL_MIN_MS = 20
+    POLL_MAX_MS = 400
+    DRAIN_BUDGET = 0.05
+
+    def __init__(self, command, log_widget, on_complete=None, on_line=None, session=None):
         self.command = command
         self.log_widget = log_widget
         self.on_complete = on_complete
+        self.on_line = on_line # Appelé (thread Tk) pour chaque ligne de sortie, ex. pour analyser le résultat
+        self.session = session # PowerShellSession optionnelle : évite de relancer powershell.exe à chaque commande
         self.output_queue = queue.Queue()
         self.process = None
+        self.returncode = None
+        self.poll_interval = self.POLL_MIN_MS
 
     def log(self, message, level="INFO"):
-        self.log_widget.config(state="normal")
         now = datetime.now().strftime("%H:%M:%S")
         tag = level if level in ["SUCCESS", "ERROR", "CMD"] else "INFO"
-        self.log_widget.insert(tk.END, f"[{now}] {message}\n", tag)
-        self.log_widget.config(state="disabled")
-        self.log_widget.see(tk.END)
-        self.log_widget.update_idletasks()
+        self.log_widget.write(f"[{now}] {message}\n", tag)
 
     def _reader_thread(self):
         try:
             for line in iter(self.process.stdout.readline, ''):
                 self.output_queue.put(line)
             self.process.stdout.close()
-            self.process.wait()
+            self.returncode = self.process.wait()
         except Exception:
             pass # Silencieux, car on gère les erreurs via le returncode
         finally:
@@ -47,6 +59,10 @@ class CommandRunner:
 
     def run(self):
         self.log(f"Exécution de la commande :\n{self.command}", "CMD")
+        if self.session:
+            self.session.submit(self.command, self.output_queue, self._set_returncode)
+            self._poll_queue()
+            return
         try:
             self.process = subprocess.Popen(
                 ['powershell.exe', '-NoProfile', '-Command', self.command],
@@ -69,29 +85,130 @@ class CommandRunner:
         except Exception as e:
             self.log(f"Erreur inattendue au lancement du processus : {e}", "ERROR")
             if self.on_complete: self.on_complete(False)
+
+    def _set_returncode(self, code):
+        self.returncode = code
     
     def _poll_queue(self):
-        try:
-            line = self.output_queue.get_nowait()
+        # Vide la file en une passe (dans la limite du budget de temps) et écrit le lot en une seule insertion
+        batch = []
+        finished = drained = False
+        deadline = time.monotonic() + self.DRAIN_BUDGET
+        while time.monotonic() < deadline:
+            try:
+                line = self.output_queue.get_nowait()
+            except queue.Empty:
+                drained = True
+                break
             if line is None: # Fin du stream
-                if self.process.returncode == 0:
-                    self.log("Commande terminée avec succès.", "SUCCESS")
-                    if self.on_complete: self.on_complete(True)
-                else:
-                    self.log(f"La commande a échoué avec le code d'erreur : {self.process.returncode}", "ERROR")
-                    if self.on_complete: self.on_complete(False)
-                return
+                finished = True
+                break
+            if line.strip():
+                batch.append(line)
+                if self.on_line: self.on_line(line)
+
+        if batch:
+            self.log_widget.write("".join(batch))
+
+        if finished:
+            if self.returncode == 0:
+                self.log("Commande terminée avec succès.", "SUCCESS")
+                if self.on_complete: self.on_complete(True)
             else:
-                if line.strip():
-                    self.log_widget.config(state="normal")
-                    self.log_widget.insert(tk.END, line)
-                    self.log_widget.config(state="disabled")
-                    self.log_widget.see(tk.END)
-        except queue.Empty:
-            pass
-        
-        self.log_widget.after(100, self._poll_queue)
+                self.log(f"La commande a échoué avec le code d'erreur : {self.returncode}", "ERROR")
+                if self.on_complete: self.on_complete(False)
+            return
 
+        # Repli progressif quand le processus est silencieux, retour immédiat au rythme rapide dès qu'il produit
+        if not drained:
+            self.poll_interval = 1 # Budget épuisé, il reste des lignes en attente
+        elif batch:
+            self.poll_interval = self.POLL_MIN_MS
+        else:
+            self.poll_interval = min(self.poll_interval * 2, self.POLL_MAX_MS)
+        self.log_widget.after(self.poll_interval, self._poll_queue)
+
+
+# =============================================================================
+# Session PowerShell persistante, partagée par les CommandRunner
+# =============================================================================
+class PowerShellSession:
+    # Un seul powershell.exe reçoit les commandes sur stdin, l'une après l'autre. La fin de chaque commande
+    # est signalée par une ligne sentinelle unique portant le code de retour ; l'environnement ($env:Path...)
+    # est conservé d'une commande à l'autre.
+    def __init__(self):
+        self.process = None
+        self.jobs = queue.Queue()
+        self.worker = None
+
+    def start(self):
+        self.process = subprocess.Popen(
+            ['powershell.exe', '-NoProfile', '-NoLogo', '-NonInteractive', '-Command', '-'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            bufsize=1,
+            creationflags=subprocess.CREATE_NO_WINDOW
+        )
+        if not self.worker:
+            self.worker = threading.Thread(target=self._worker_thread, daemon=True)
+            self.worker.start()
+
+    def is_alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def submit(self, command, output_queue, on_exit):
+        # La sortie est poussée dans output_queue, suivie de None ; on_exit(code) est appelé juste avant.
+        self.jobs.put((command, output_queue, on_exit))
+
+    def close(self):
+        self.jobs.put(None)
+        if self.is_alive():
+            try:
+                self.process.stdin.write("exit\n"); self.process.stdin.flush()
+                self.process.wait(timeout=3)
+            except Exception:
+                self.process.kill()
+
+    def _worker_thread(self):
+        while True:
+            job = self.jobs.get()
+            if job is None: return
+            command, output_queue, on_exit = job
+            try:
+                if not self.is_alive(): self.start()
+                code = self._execute(command, output_queue)
+            except Exception as e:
+                output_queue.put(f"Erreur de la session PowerShell : {e}\n")
+                code = -1
+            on_exit(code)
+            output_queue.put(None)
+
+    def _execute(self, command, output_queue):
+        import uuid
+        import base64
+        token = uuid.uuid4().hex
+        marker = f"__BOVO_FIN_{token}__"
+        encoded = base64.b64encode(command.encode('utf-8')).decode('ascii')
+        # La commande est transmise en base64 (une seule ligne, aucun échappement) et exécutée dans la portée
+        # courante. La sentinelle est assemblée côté PowerShell pour ne jamais apparaître telle quelle dans l'entrée.
+        script = (
+            "$global:LASTEXITCODE = 0; "
+            f"try {{ . ([scriptblock]::Create([Text.Encoding]::UTF8.GetString([Convert]::FromBase64String('{encoded}')))); "
+            "$__ok = $? -and ($LASTEXITCODE -eq 0) } catch { Write-Output ($_ | Out-String); $__ok = $false }; "
+            f"Write-Output ('__BOVO_FIN_' + '{token}__ ' + $(if ($__ok) {{ 0 }} elseif ($LASTEXITCODE) {{ $LASTEXITCODE }} else {{ 1 }}))"
+        )
+        self.process.stdin.write(script + "\n")
+        self.process.stdin.flush()
+        for line in iter(self.process.stdout.readline, ''):
+            if line.startswith(marker):
+                try: return int(line[len(marker):].strip())
+                except ValueError: return 1
+            output_queue.put(line)
+        return -1 # Processus terminé avant la sentinelle
 
 # =============================================================================
 # Classe principale du Wizard
@@ -105,23 +222,50 @@ class PrereqWizard(tk.Tk):
         self.style = ttk.Style(self)
         self.style.configure("TButton", padding=6, relief="flat", font=('Segoe UI', 10))
 
-        container = ttk.Frame(self, padding=10)
-        container.pack(fill="both", expand=True)
+        ### AJOUT ###: Session PowerShell persistante (créée à la première commande, fermée avec l'assistant)
+        self.use_shell_session = tk.BooleanVar(value=True)
+        self.shell_session = None
+        ### AJOUT ###: Installation depuis un cache local de paquets (voir choco_tools.prefetch_packages)
+        self.use_local_cache = tk.BooleanVar(value=False)
+        self.local_cache_dir = tk.StringVar()
+        self.protocol("WM_DELETE_WINDOW", self.destroy)
 
-        self.frames = {}
-        for F in (WelcomePage, ChocoCheckPage, ToolsInstallPage, PostgresPage, FinishPage):
-            frame = F(container, self)
-            self.frames[F] = frame
-            frame.grid(row=0, column=0, sticky="nsew")
+        self.container = ttk.Frame(self, padding=10)
+        self.container.pack(fill="both", expand=True)
 
+        ### MODIFICATION ###: Les pages sont construites à leur premier affichage (démarrage plus rapide)
+        self.frames = {}
         self.show_frame(WelcomePage)
 
     def show_frame(self, cont):
+        if cont not in self.frames:
+            frame = cont(self.container, self)
+            self.frames[cont] = frame
+            frame.grid(row=0, column=0, sticky="nsew")
         frame = self.frames[cont]
         frame.tkraise()
         if hasattr(frame, 'on_show'):
             frame.on_show()
 
+    def get_shell_session(self):
+        if not self.use_shell_session.get():
+            return None
+        if self.shell_session is None:
+            try:
+                self.shell_session = PowerShellSession()
+                self.shell_session.start()
+            except Exception:
+                # powershell.exe introuvable, etc. : CommandRunner signalera l'erreur en mode processus unique
+                self.shell_session = None
+        return self.shell_session
+
+    def package_cache_dir(self):
+        return self.local_cache_dir.get() if self.use_local_cache.get() else None
+
+    def destroy(self):
+        if self.shell_session: self.shell_session.close()
+        super().destroy()
+
 # =============================================================================
 # Classe de base pour les pages
 # =============================================================================
@@ -131,15 +275,9 @@ class WizardPage(ttk.Frame):
         self.controller = controller
 
     def create_log_area(self):
-        log_frame = ttk.Frame(self)
-        log_frame.pack(fill="both", expand=True, padx=20, pady=10)
-        self.log_text = tk.Text(log_frame, wrap="word", state="disabled", font=("Consolas", 9), relief=tk.SOLID, borderwidth=1)
-        
-        v_scroll = ttk.Scrollbar(log_frame, orient="vertical", command=self.log_text.yview)
-        self.log_text.config(yscrollcommand=v_scroll.set)
-        
-        v_scroll.pack(side="right", fill="y")
-        self.log_text.pack(side="left", fill="both", expand=True)
+        ### MODIFICATION ###: Log borné, adossé à un fichier de spool (voir spooled_log.py)
+        self.log_text = SpooledLog(self, spool_prefix="prereqs_", wrap="word", font=("Consolas", 9), relief=tk.SOLID, borderwidth=1)
+        self.log_text.pack(fill="both", expand=True, padx=20, pady=10)
 
         self.log_text.tag_configure("SUCCESS", foreground="#008000", font=("Consolas", 9, "bold"))
         self.log_text.tag_configure("ERROR", foreground="#d91e18")
@@ -147,6 +285,17 @@ class WizardPage(ttk.Frame):
         self.log_text.tag_configure("INFO", foreground="#555555")
         return self.log_text
 
+    def run_command(self, command, on_complete, on_line=None):
+        runner = CommandRunner(command, self.log_text, on_complete=on_complete, on_line=on_line, session=self.controller.get_shell_session())
+        runner.run()
+
+    ### AJOUT ###: Décisions partagées avec le mode sans surveillance (inventaire, version de PostgreSQL...),
+    # journalisées dans le log de la page
+    def prereq_engine(self):
+        from provisioning_engine import PrereqEngine
+        return PrereqEngine({"local_cache_dir": self.controller.package_cache_dir()},
+                            log=lambda message, level="INFO": self.log_text.write(f"{message}\n", level))
+
 # =============================================================================
 # Page 1: Accueil
 # =============================================================================
@@ -159,13 +308,76 @@ class WelcomePage(WizardPage):
                 "  • Il installera Chocolatey si celui-ci est absent.\n"
                 "  • Il installera Git, Python, Node.js et VS Code.\n"
                 "  • Il installera et configurera une base de données PostgreSQL.\n\n"
-                "Une connexion Internet est requise.\n"
+                "Une connexion Internet est requise, sauf installation depuis un cache local.\n"
                 "Ce processus doit être exécuté avec des droits d'administrateur.")
         ttk.Label(self, text=info, justify="left", font=("Segoe UI", 11)).pack(pady=20, padx=40)
+        ttk.Checkbutton(self, text="Exécuter les commandes dans une session PowerShell persistante (plus rapide)", variable=controller.use_shell_session).pack(padx=40, anchor="w")
+
+        ### AJOUT ###: Cache local de paquets (préparé une fois, réutilisable sur des sites sans Internet)
+        cache_frame = ttk.LabelFrame(self, text="Source des paquets", padding=10)
+        cache_frame.pack(padx=40, pady=10, fill="x")
+        ttk.Checkbutton(cache_frame, text="Installer depuis un cache local (aucun accès réseau)", variable=controller.use_local_cache).grid(row=0, column=0, columnspan=3, sticky="w")
+        ttk.Label(cache_frame, text="Dossier du cache :").grid(row=1, column=0, sticky="w", pady=5)
+        ttk.Entry(cache_frame, textvariable=controller.local_cache_dir).grid(row=1, column=1, sticky="ew", padx=5, pady=5)
+        ttk.Button(cache_frame, text="Parcourir...", command=self.browse_cache_dir).grid(row=1, column=2, pady=5)
+        self.prefetch_button = ttk.Button(cache_frame, text="Préparer le cache (téléchargement)", command=self.prefetch_cache)
+        self.prefetch_button.grid(row=2, column=0, sticky="w")
+        self.cache_status = ttk.Label(cache_frame, text="", foreground="gray")
+        self.cache_status.grid(row=2, column=1, columnspan=2, sticky="w", padx=5)
+        cache_frame.columnconfigure(1, weight=1)
         
         btn_frame = ttk.Frame(self)
         btn_frame.pack(side="bottom", fill="x", padx=20, pady=20)
-        ttk.Button(btn_frame, text="Suivant", command=lambda: controller.show_frame(ChocoCheckPage)).pack(side="right")
+        self.next_button = ttk.Button(btn_frame, text="Suivant", command=self.go_next)
+        self.next_button.pack(side="right")
+
+    def browse_cache_dir(self):
+        path = filedialog.askdirectory(title="Dossier du cache de paquets")
+        if path: self.controller.local_cache_dir.set(path)
+
+    def prefetch_cache(self):
+        from choco_tools import prefetch_packages
+        cache_dir = self.controller.local_cache_dir.get()
+        if not cache_dir:
+            self.browse_cache_dir(); cache_dir = self.controller.local_cache_dir.get()
+            if not cache_dir: return
+        self.prefetch_button.config(state="disabled")
+        def report(message): self.after(0, lambda: self.cache_status.config(text=message))
+        def task():
+            try:
+                manifest = prefetch_packages(cache_dir, log=report)
+                report(f"Cache prêt : {len(manifest['packages'])} paquets.")
+            except Exception as e:
+                report(f"Échec de la préparation du cache : {e}")
+            self.after(0, lambda: self.prefetch_button.config(state="normal"))
+        threading.Thread(target=task, daemon=True).start()
+
+    def go_next(self):
+        from choco_tools import load_manifest
+        if not self.controller.use_local_cache.get():
+            self.controller.show_frame(ChocoCheckPage)
+            return
+        ### MODIFICATION ###: Vérification des empreintes (lecture de tout le cache) hors du thread Tk
+        cache_dir = self.controller.local_cache_dir.get()
+        self.next_button.config(state="disabled")
+        self.cache_status.config(text="Vérification du cache...")
+        def task():
+            try: manifest, error = load_manifest(cache_dir), None
+            except Exception as e: manifest, error = None, e
+            self.after(0, lambda: self.on_cache_verified(manifest, error))
+        threading.Thread(target=task, daemon=True).start()
+
+    def on_cache_verified(self, manifest, error):
+        self.next_button.config(state="normal")
+        if error is not None:
+            self.cache_status.config(text="Cache invalide.")
+            messagebox.showerror("Cache invalide", f"Le cache local est inutilisable :\n{error}")
+            return
+        self.cache_status.config(text=f"Cache vérifié : {len(manifest['packages'])} paquets.")
+        online = [entry.get("id", name) for name, entry in manifest["packages"].items() if entry.get("downloads_at_install")]
+        if online:
+            messagebox.showwarning("Cache local", "Ces paquets téléchargent encore leur installeur au moment de l'installation :\n" + ", ".join(online))
+        self.controller.show_frame(ChocoCheckPage)
 
 # =============================================================================
 # Page 2: Vérification et Installation de Chocolatey
@@ -196,27 +408,30 @@ class ChocoCheckPage(WizardPage):
             self.status_label.config(text="Chocolatey est déjà installé.", foreground="green")
             self.install_button.config(state="disabled")
             self.next_button.config(state="normal")
-            self.log_text.config(state="normal")
-            self.log_text.delete('1.0', tk.END)
-            self.log_text.insert('1.0', "Chocolatey détecté. Vous pouvez passer à l'étape suivante.")
-            self.log_text.config(state="disabled")
+            self.log_text.clear()
+            self.log_text.write("Chocolatey détecté. Vous pouvez passer à l'étape suivante.")
         else:
             self.status_label.config(text="Chocolatey n'est pas installé.", foreground="red")
             self.install_button.config(state="normal")
             self.next_button.config(state="disabled")
 
     def install_choco(self):
+        from provisioning_engine import choco_bootstrap_command
         self.install_button.config(state="disabled")
         self.next_button.config(state="disabled")
-        command = (
-            "Set-ExecutionPolicy Bypass -Scope Process -Force; "
-            "[System.Net.ServicePointManager]::SecurityProtocol = [System.Net.ServicePointManager]::SecurityProtocol -bor 3072; "
-            "iex ((New-Object System.Net.WebClient).DownloadString('https://community.chocolatey.org/install.ps1'))"
-        )
-        runner = CommandRunner(command, self.log_text, on_complete=self.on_choco_install_complete)
-        runner.run()
+        try: command = choco_bootstrap_command(self.controller.package_cache_dir())
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Cache invalide", f"Impossible d'installer Chocolatey depuis le cache local :\n{e}")
+            self.install_button.config(state="normal")
+            return
+        self.run_command(command, self.on_choco_install_complete)
 
     def on_choco_install_complete(self, success):
+        from provisioning_engine import REFRESH_ENV_COMMAND
+        if success and self.controller.shell_session:
+            # La session persistante peut recharger le PATH : pas besoin de relancer l'assistant
+            self.run_command(REFRESH_ENV_COMMAND, self.on_env_refreshed)
+            return
         if success:
             messagebox.showinfo("Succès", "Chocolatey a été installé. Vous devez redémarrer ce terminal ou cet assistant pour que le PATH soit mis à jour.\n\nL'assistant va maintenant se fermer. Veuillez le relancer.")
             self.controller.destroy()
@@ -224,6 +439,17 @@ class ChocoCheckPage(WizardPage):
             messagebox.showerror("Erreur", "L'installation de Chocolatey a échoué. Veuillez consulter les logs.")
             self.install_button.config(state="normal")
 
+    def on_env_refreshed(self, success):
+        from provisioning_engine import refresh_process_path
+        try: refresh_process_path()
+        except Exception: pass
+        if success and shutil.which("choco"):
+            self.status_label.config(text="Chocolatey a été installé.", foreground="green")
+            self.next_button.config(state="normal")
+        else:
+            messagebox.showinfo("Succès", "Chocolatey a été installé. Vous devez redémarrer ce terminal ou cet assistant pour que le PATH soit mis à jour.\n\nL'assistant va maintenant se fermer. Veuillez le relancer.")
+            self.controller.destroy()
+
 # =============================================================================
 # Page 3: Installation des outils de dev
 # =============================================================================
@@ -233,7 +459,7 @@ class ToolsInstallPage(WizardPage):
         ttk.Label(self, text="Étape 2: Installer les Outils de Développement", font=("Segoe UI", 16, "bold")).pack(pady=10)
         
         ### AJOUT ###: Label d'information sur le comportement de l'installation.
-        info_label = ttk.Label(self, text="Cochez les outils à installer. Si un outil est déjà présent, il sera mis à jour ou ignoré.", font=("Segoe UI", 10))
+        info_label = ttk.Label(self, text="Cochez les outils à installer. Les outils déjà présents dans une version suffisante sont ignorés, les autres sont installés ou mis à jour.", font=("Segoe UI", 10))
         info_label.pack(pady=(0, 10))
 
         self.tools = {
@@ -245,8 +471,14 @@ class ToolsInstallPage(WizardPage):
 
         check_frame = ttk.Frame(self)
         check_frame.pack(pady=5, padx=20, fill="x")
-        for name, data in self.tools.items():
-            ttk.Checkbutton(check_frame, text=f"Installer {name}", variable=data["var"]).pack(anchor="w")
+        for i, (name, data) in enumerate(self.tools.items()):
+            ttk.Checkbutton(check_frame, text=f"Installer {name}", variable=data["var"]).grid(row=i, column=0, sticky="w")
+            data["status"] = ttk.Label(check_frame, text="", width=30)
+            data["status"].grid(row=i, column=1, sticky="w", padx=10)
+
+        ### AJOUT ###: Une seule invocation de Chocolatey pour tous les outils cochés
+        self.batch_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(check_frame, text="Installation groupée (une seule exécution de Chocolatey)", variable=self.batch_var).grid(row=len(self.tools), column=0, columnspan=2, sticky="w", pady=(5, 0))
 
         self.log_text = self.create_log_area()
 
@@ -259,6 +491,15 @@ class ToolsInstallPage(WizardPage):
         ttk.Button(self.btn_frame, text="Précédent", command=lambda: controller.show_frame(ChocoCheckPage)).pack(side="right", padx=10)
         
         self.install_queue = []
+        self.current_tool = None
+        self.batch_results = {}
+
+    def set_tool_status(self, package, status):
+        statuses = {"pending": ("○ En attente", "gray"), "running": ("… En cours", "blue"), "success": ("✔️ Installé", "green"),
+                    "uptodate": ("✔️ Déjà à jour", "green"), "error": ("❌ Échec", "red")}
+        text, color = statuses[status]
+        for data in self.tools.values():
+            if data["cmd"] == package: data["status"].config(text=text, foreground=color)
 
     def run_installation(self):
         self.install_button.config(state="disabled")
@@ -270,27 +511,74 @@ class ToolsInstallPage(WizardPage):
             self.next_button.config(state="normal")
             self.install_button.config(state="normal")
             return
-            
+        for data in self.tools.values(): data["status"].config(text="")
+        for package in self.install_queue: self.set_tool_status(package, "pending")
+
+        ### AJOUT ###: Inventaire de l'existant (hors thread Tk, les sondes lancent des processus)
+        self.log_text.write("Inventaire des paquets déjà installés...\n", "CMD")
+        packages = list(self.install_queue)
+        engine = self.prereq_engine()
+        def task():
+            plan = engine.plan_tools(packages)
+            self.after(0, lambda: self.on_inventory_ready(plan))
+        threading.Thread(target=task, daemon=True).start()
+
+    def on_inventory_ready(self, plan):
+        self.install_queue = []
+        for package, action, version in plan:
+            if action == "ok":
+                self.set_tool_status(package, "uptodate")
+                self.log_text.write(f"{package} : version {version} déjà installée, ignoré.\n", "INFO")
+            else:
+                self.install_queue.append(package)
+                self.log_text.write(f"{package} : {'mise à jour depuis ' + version if action == 'upgrade' else 'à installer'}.\n", "INFO")
+
+        if self.batch_var.get() and len(self.install_queue) > 1:
+            self.run_batch_install()
+        else:
+            self.process_next_in_queue()
+
+    ### AJOUT ###: Installation groupée. Chocolatey n'est initialisé et ne rafraîchit les sources qu'une fois ;
+    # le résultat de chaque paquet est relevé dans la sortie pour conserver un statut par outil.
+    def run_batch_install(self):
+        from provisioning_engine import choco_upgrade_command
+        packages, self.install_queue = self.install_queue, []
+        self.batch_results = {}
+        for package in packages: self.set_tool_status(package, "running")
+        command = choco_upgrade_command(packages, self.controller.package_cache_dir())
+        self.run_command(command, lambda success: self.on_batch_install_complete(packages, success), on_line=self.record_choco_result)
+
+    def record_choco_result(self, line):
+        from choco_tools import parse_choco_result
+        result = parse_choco_result(line)
+        if result: self.batch_results[result[0]] = result[1]
+
+    def on_batch_install_complete(self, packages, success):
+        results = self.prereq_engine().tool_results(packages, self.batch_results, success)
+        failed = [package for package in packages if results[package] == "error"]
+        for package in packages: self.set_tool_status(package, results[package])
+        if failed:
+            messagebox.showwarning("Erreur d'installation", f"L'installation des outils suivants a échoué : {', '.join(failed)}.\nVérifiez les logs. Vous pouvez continuer, mais l'application risque de ne pas fonctionner.")
         self.process_next_in_queue()
 
     def process_next_in_queue(self):
+        from provisioning_engine import choco_upgrade_command
         if not self.install_queue:
-            self.log_text.config(state="normal")
-            self.log_text.insert(tk.END, "\n=== TOUTES LES INSTALLATIONS SONT TERMINÉES ===\n", "SUCCESS")
-            self.log_text.config(state="disabled")
+            self.log_text.write("\n=== TOUTES LES INSTALLATIONS SONT TERMINÉES ===\n", "SUCCESS")
             self.next_button.config(state="normal")
             self.install_button.config(state="normal")
             return
 
-        tool = self.install_queue.pop(0)
+        tool = self.current_tool = self.install_queue.pop(0)
+        self.set_tool_status(tool, "running")
         
-        ### MODIFICATION ###: Le flag --force a été retiré.
-        command = f"choco install {tool} -y"
+        ### MODIFICATION ###: Le flag --force a été retiré. `upgrade` installe aussi les paquets absents.
+        command = choco_upgrade_command([tool], self.controller.package_cache_dir())
         
-        runner = CommandRunner(command, self.log_text, on_complete=self.on_tool_install_complete)
-        runner.run()
+        self.run_command(command, self.on_tool_install_complete)
 
     def on_tool_install_complete(self, success):
+        self.set_tool_status(self.current_tool, "success" if success else "error")
         if not success:
             messagebox.showwarning("Erreur d'installation", "L'installation d'un outil a échoué. Vérifiez les logs. Vous pouvez continuer, mais l'application risque de ne pas fonctionner.")
         # On continue même en cas d'échec pour essayer d'installer les autres outils.
@@ -320,10 +608,10 @@ class PostgresPage(WizardPage):
         
         ttk.Separator(form_frame, orient="horizontal").grid(row=1, column=0, columnspan=2, sticky="ew", pady=10)
         
-        ttk.Label(form_frame, text="Nom de la nouvelle base de données:").grid(row=2, column=0, sticky="w", pady=5)
+        ttk.Label(form_frame, text="Nom de la base (plusieurs : séparées par des virgules):").grid(row=2, column=0, sticky="w", pady=5)
         ttk.Entry(form_frame, textvariable=self.pg_vars["db_name"]).grid(row=2, column=1, sticky="ew", pady=5, padx=5)
 
-        ttk.Label(form_frame, text="Nom du nouvel utilisateur de la base:").grid(row=3, column=0, sticky="w", pady=5)
+        ttk.Label(form_frame, text="Utilisateur (un seul, ou un par base):").grid(row=3, column=0, sticky="w", pady=5)
         ttk.Entry(form_frame, textvariable=self.pg_vars["db_user"]).grid(row=3, column=1, sticky="ew", pady=5, padx=5)
 
         ttk.Label(form_frame, text="Mot de passe du nouvel utilisateur:").grid(row=4, column=0, sticky="w", pady=5)
@@ -342,6 +630,7 @@ class PostgresPage(WizardPage):
         ttk.Button(self.btn_frame, text="Précédent", command=lambda: controller.show_frame(ToolsInstallPage)).pack(side="right", padx=10)
 
     def run_postgres_setup(self):
+        from provisioning_engine import postgres_install_command
         admin_pass = self.pg_vars["admin_pass"].get()
         if not admin_pass:
             messagebox.showerror("Erreur", "Le mot de passe administrateur ('postgres') est obligatoire.")
@@ -352,11 +641,15 @@ class PostgresPage(WizardPage):
 
         self.controller.db_details = {k: v.get() for k, v in self.pg_vars.items()}
 
-        # La commande Choco pour Postgres n'utilise le mot de passe que lors de la première installation.
-        # Sur les exécutions suivantes, elle sera ignorée, ce qui est le comportement souhaité.
-        command = f"choco install postgresql14 --params '\"/Password:{admin_pass}\"' -y"
-        runner = CommandRunner(command, self.log_text, on_complete=self.on_postgres_install_complete)
-        runner.run()
+        ### AJOUT ###: PostgreSQL déjà présent dans une version suffisante : on passe directement à la configuration
+        installed_version = self.prereq_engine().postgres_version()
+        if installed_version:
+            self.log_text.write(f"postgresql14 : version {installed_version} déjà installée, installation ignorée.\n", "INFO")
+            self.configure_db()
+            return
+
+        command = postgres_install_command(admin_pass, self.controller.package_cache_dir())
+        self.run_command(command, self.on_postgres_install_complete)
         
     def on_postgres_install_complete(self, success):
         if not success:
@@ -366,31 +659,46 @@ class PostgresPage(WizardPage):
         
         self.configure_db()
 
+    ### MODIFICATION ###: Provisionnement idempotent en une seule session (voir db_tools.py).
+    # Relancer l'assistant sur une base déjà configurée est sans effet.
     def configure_db(self):
+        from db_tools import build_targets, has_driver, provision_with_driver
+        from provisioning_engine import psql_provision_command
         details = self.controller.db_details
-        db_name = details['db_name']
-        db_user = details['db_user']
-        db_pass = details['db_pass'].replace("'", "''")
-
-        sql_commands = [
-            f"CREATE DATABASE {db_name};",
-            f"CREATE USER {db_user} WITH PASSWORD '{db_pass}';",
-            f"GRANT ALL PRIVILEGES ON DATABASE {db_name} TO {db_user};"
-        ]
-        
-        ps_command_block = "; ".join([f"psql -U postgres -c \\\"{cmd}\\\"" for cmd in sql_commands])
-        full_command = f"$env:PGPASSWORD='{details['admin_pass']}'; {ps_command_block}"
-        
-        runner = CommandRunner(full_command, self.log_text, on_complete=self.on_db_config_complete)
-        runner.run()
+        try:
+            targets = build_targets(details['db_name'], details['db_user'], details['db_pass'])
+        except ValueError as e:
+            messagebox.showerror("Erreur", str(e))
+            self.install_button.config(state="normal")
+            return
+
+        if has_driver():
+            self.log_text.write(f"Provisionnement de {len(targets)} base(s) via psycopg2 (une connexion)...\n", "CMD")
+            def task():
+                try:
+                    provision_with_driver(targets, details['admin_pass'], log=lambda message: self.log_text.write(message + "\n"))
+                    success = True
+                except Exception as e:
+                    self.log_text.write(f"Erreur : {e}\n", "ERROR")
+                    success = False
+                self.after(0, lambda: self.on_db_config_complete(success))
+            threading.Thread(target=task, daemon=True).start()
+            return
+
+        # Repli sans pilote : un seul psql exécute le script complet (une authentification)
+        self.sql_script_path = self.prereq_engine().write_psql_script(targets)
+        self.run_command(psql_provision_command(self.sql_script_path, details['admin_pass']), self.on_db_config_complete)
 
     def on_db_config_complete(self, success):
+        # Le script contient des mots de passe : il ne doit pas rester sur le disque
+        script_path = getattr(self, "sql_script_path", None)
+        if script_path and os.path.exists(script_path): os.remove(script_path)
+        self.sql_script_path = None
         if success:
             messagebox.showinfo("Succès", "PostgreSQL a été installé et la base de données a été configurée avec succès.")
             self.next_button.config(state="normal")
         else:
-            # Ce message est important car il gère le cas où l'utilisateur relance le script
-            messagebox.showerror("Erreur", "La configuration de la base de données a échoué. Il est possible que la base ou l'utilisateur existe déjà. Vérifiez les logs.")
+            messagebox.showerror("Erreur", "La configuration de la base de données a échoué. Vérifiez le mot de passe 'postgres' et les logs.")
             self.install_button.config(state="normal")
 
 # =============================================================================
@@ -431,6 +739,7 @@ class FinishPage(WizardPage):
 # Point d'entrée
 # =============================================================================
 if __name__ == "__main__":
+    import ctypes
     try:
         is_admin = ctypes.windll.shell32.IsUserAnAdmin() != 0
     except Exception:
@@ -447,4 +756,5 @@ if __name__ == "__main__":
         sys.exit(0)
     
     app = PrereqWizard()
+    STARTUP.watch_first_paint(app)
     app.mainloop()
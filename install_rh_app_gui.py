@@ -3,21 +3,22 @@
 # - La création du super-utilisateur est désormais optionnelle via une case à cocher.
 # - Correction du crash si l'email du super-utilisateur existe déjà.
 
+from startup_report import StartupTimer
+STARTUP = StartupTimer("install_rh_app_gui")
+
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import configparser
 import subprocess
 import threading
-import os
 import sys
 import shutil
-import socket
-import random
-import string
-import ctypes
 from datetime import datetime
-import queue
-import importlib
+from spooled_log import SpooledLog
+from app_config import load_app_config
+from tuning_profile import PROFILE_KEYS, PROFILE_CHOICES, detect_hardware, build_profile, connections_needed
+# Modules utilisés rarement (ctypes, importlib...) et moteur d'installation (provisioning_engine, git_sync, db_tools) :
+# importés là où ils servent
+STARTUP.mark("imports")
 
 # =============================================================================
 # Classe pour stocker l'état partagé
@@ -26,6 +27,7 @@ class InstallerState:
     def __init__(self):
         self.config = {}
         self.install_path = ""
+        self.db_preflight = None  # Rapport de pré-vérification PostgreSQL (ConfigPage)
 
 # =============================================================================
 # Classe principale du Wizard
@@ -43,31 +45,25 @@ class InstallerWizard(tk.Tk):
             return
             
         self.title(f"Assistant d'Installation - {self.state.config.get('app_name', 'Application')}")
-        self.geometry("900x750")
+        self.geometry("900x800")
 
-        container = ttk.Frame(self, padding=10)
-        container.pack(fill="both", expand=True)
-        container.grid_rowconfigure(0, weight=1)
-        container.grid_columnconfigure(0, weight=1)
+        self.container = ttk.Frame(self, padding=10)
+        self.container.pack(fill="both", expand=True)
+        self.container.grid_rowconfigure(0, weight=1)
+        self.container.grid_columnconfigure(0, weight=1)
 
+        ### MODIFICATION ###: Les pages sont construites à leur premier affichage (démarrage plus rapide)
         self.frames = {}
-        for F in (WelcomePage, PrereqCheckPage, RepoPage, ConfigPage, InstallProgressPage, FinishPage):
-            frame = F(container, self)
-            self.frames[F] = frame
-            frame.grid(row=0, column=0, sticky="nsew")
-
         self.show_frame(WelcomePage)
 
     def load_config(self):
-        parser = configparser.ConfigParser()
-        if not os.path.exists("config.ini"):
-            raise FileNotFoundError("Le fichier 'config.ini' est manquant à côté du script.")
-        parser.read("config.ini")
-        self.state.config['app_name'] = parser.get('Application', 'name', fallback="Application sans nom")
-        self.state.config['backend_url'] = parser.get('Repositories', 'backend_url')
-        self.state.config['frontend_url'] = parser.get('Repositories', 'frontend_url')
+        self.state.config.update(load_app_config("config.ini"))
 
     def show_frame(self, cont):
+        if cont not in self.frames:
+            frame = cont(self.container, self)
+            self.frames[cont] = frame
+            frame.grid(row=0, column=0, sticky="nsew")
         frame = self.frames[cont]
         frame.tkraise()
         if hasattr(frame, 'on_show'):
@@ -84,14 +80,6 @@ class WizardPage(ttk.Frame):
 # =============================================================================
 # Fonctions et Widgets Utilitaires
 # =============================================================================
-def execute_command(command, description):
-    try:
-        process = subprocess.run(command, capture_output=True, text=True, encoding='utf-8', shell=True, check=True)
-        return True, process.stdout
-    except (subprocess.CalledProcessError, FileNotFoundError) as e:
-        error_output = e.stderr if hasattr(e, 'stderr') else str(e)
-        return False, f"Échec de '{description}':\n{error_output}"
-
 class StatusLabel(ttk.Frame):
     def __init__(self, parent, text):
         super().__init__(parent)
@@ -184,7 +172,9 @@ class RepoPage(WizardPage):
         self.pat_var = tk.StringVar()
         ttk.Entry(self, textvariable=self.pat_var, show="*").pack(anchor="w", padx=40, pady=5, ipady=3)
         self.validate_button = ttk.Button(self, text="Valider les URLs", command=self.validate_repos)
-        self.validate_button.pack(pady=20)
+        self.validate_button.pack(pady=(20, 5))
+        self.validation_label = ttk.Label(self, text="", font=("Segoe UI", 9))
+        self.validation_label.pack()
         self.button_frame = ttk.Frame(self)
         self.button_frame.pack(side="bottom", fill="x", padx=20, pady=20)
         self.next_button = ttk.Button(self.button_frame, text="Suivant", command=lambda: controller.show_frame(ConfigPage), state="disabled")
@@ -195,10 +185,11 @@ class RepoPage(WizardPage):
         self.backend_url_var.set(self.controller.state.config.get('backend_url', ''))
         self.frontend_url_var.set(self.controller.state.config.get('frontend_url', ''))
 
+    ### MODIFICATION ###: Les deux dépôts sont interrogés en parallèle, hors du thread Tk, avec un délai maximal
     def validate_repos(self):
         urls_to_check = {"Backend": self.backend_url_var.get(), "Frontend": self.frontend_url_var.get()}
         pat = self.pat_var.get()
-        all_valid, errors = True, []
+        all_valid, errors, urls_to_probe = True, [], {}
         for name, url in urls_to_check.items():
             if not url or "VOTRE" in url:
                 errors.append(f"L'URL pour le dépôt {name} est invalide ou non configurée."); all_valid = False; continue
@@ -211,17 +202,46 @@ class RepoPage(WizardPage):
                 else:
                     errors.append(f"Le PAT ne peut être injecté que dans une URL HTTPS pour le dépôt {name}."); all_valid = False; continue
             
-            success, output = execute_command(f'git ls-remote --exit-code "{url_to_validate}"', f"Validation de {name}")
-            if not success:
-                errors.append(f"Impossible de joindre le dépôt {name}.\n   - Vérifiez l'URL et l'accès réseau.\n   - Si privé, vérifiez le PAT et ses droits ('repo').\n   - Erreur: {output}"); all_valid = False
-        
-        if all_valid:
+            urls_to_probe[name] = url_to_validate
+
+        if not all_valid:
+            messagebox.showerror("Échec de la validation", "\n\n".join(errors))
+            self.next_button.config(state="disabled")
+            return
+        timeout = self.controller.state.config.get('git_timeout', 20)
+        self.validate_button.config(state="disabled"); self.next_button.config(state="disabled")
+        self.validation_label.config(text=f"Validation en cours (délai maximal {timeout} s)...", foreground="gray")
+        def worker():
+            from git_sync import probe_repositories
+            results = probe_repositories(urls_to_probe, timeout)
+            self.after(0, lambda: self.on_validation_done(results, dict(urls_to_check), pat))
+        threading.Thread(target=worker, daemon=True).start()
+
+    def on_validation_done(self, results, urls, pat):
+        from git_sync import resolve_ref
+        config = self.controller.state.config
+        self.validate_button.config(state="normal")
+        errors, commits = [], {}
+        for name, (refs, error) in results.items():
+            if error:
+                errors.append(f"Impossible de joindre le dépôt {name}.\n   - Vérifiez l'URL et l'accès réseau.\n   - Si privé, vérifiez le PAT et ses droits ('repo').\n   - Erreur: {error}")
+                continue
+            ref = config.get(f"{name.lower()}_ref", "")
+            commits[name] = resolve_ref(refs, ref)
+            if not commits[name]: errors.append(f"Dépôt {name} : branche ou tag '{ref}' introuvable.")
+
+        if not errors:
+            self.validation_label.config(text="  ".join(f"{name} : {commit[:10]}" for name, commit in commits.items()), foreground="green")
             messagebox.showinfo("Succès", "Les deux URLs de dépôts sont valides et accessibles.")
             self.next_button.config(state="normal")
-            self.controller.state.config['backend_url'] = self.backend_url_var.get()
-            self.controller.state.config['frontend_url'] = self.frontend_url_var.get()
-            self.controller.state.config['pat'] = pat
+            config['backend_url'] = urls["Backend"]
+            config['frontend_url'] = urls["Frontend"]
+            config['pat'] = pat
+            # Commits publiés : l'installation les extrait tels quels et n'effectue pas de mise à jour s'ils sont déjà présents
+            config['backend_commit'] = commits["Backend"]
+            config['frontend_commit'] = commits["Frontend"]
         else:
+            self.validation_label.config(text="Échec de la validation.", foreground="red")
             messagebox.showerror("Échec de la validation", "\n\n".join(errors))
             self.next_button.config(state="disabled")
 
@@ -302,9 +322,25 @@ class ConfigPage(WizardPage):
         ttk.Label(other_frame, text="Mot de passe BioStar 2:").grid(row=3, column=0, sticky="w", padx=5, pady=3)
         ttk.Entry(other_frame, textvariable=self.biostar_vars["password"], show="*").grid(row=3, column=1, sticky="ew", padx=5, pady=3)
         
+        ### AJOUT ###: Profil de performance (écrit dans backend/.env, relu par le lanceur) : proposé selon la machine, modifiable
+        tuning_frame = ttk.LabelFrame(self, text="Profil de Performance", padding=10)
+        tuning_frame.grid(row=4, column=0, columnspan=2, padx=20, pady=10, sticky="ew")
+        self.hardware = detect_hardware()
+        self.hardware_label = ttk.Label(tuning_frame, foreground="gray")
+        self.hardware_label.grid(row=0, column=0, columnspan=6, sticky="w", padx=5)
+        self.tuning_vars = {key: tk.StringVar() if isinstance(default, str) else tk.IntVar() for key, (default, _) in PROFILE_KEYS.items()}
+        for i, (key, (default, text)) in enumerate(PROFILE_KEYS.items()):
+            row, column = 1 + i // 3, (i % 3) * 2
+            ttk.Label(tuning_frame, text=f"{text}:").grid(row=row, column=column, sticky="w", padx=5, pady=3)
+            if key in PROFILE_CHOICES: widget = ttk.Combobox(tuning_frame, textvariable=self.tuning_vars[key], values=PROFILE_CHOICES[key], state="readonly", width=10)
+            else: widget = ttk.Entry(tuning_frame, textvariable=self.tuning_vars[key], width=8)
+            widget.grid(row=row, column=column + 1, sticky="w", padx=5, pady=3)
+        ttk.Button(tuning_frame, text="Recalculer", command=self.recompute_tuning).grid(row=1 + len(PROFILE_KEYS) // 3, column=5, sticky="e", padx=5, pady=3)
+        self.recompute_tuning()
+
         # --- Navigation ---
         button_frame = ttk.Frame(self)
-        button_frame.grid(row=4, column=0, columnspan=2, sticky="ew", pady=20, padx=20)
+        button_frame.grid(row=5, column=0, columnspan=2, sticky="ew", pady=20, padx=20)
         self.next_button = ttk.Button(button_frame, text="Suivant", command=self.save_and_continue, state="disabled")
         self.next_button.pack(side="right")
         ttk.Button(button_frame, text="Précédent", command=lambda: controller.show_frame(RepoPage)).pack(side="right", padx=10)
@@ -317,7 +353,23 @@ class ConfigPage(WizardPage):
         for entry in self.su_entries:
             entry.config(state=new_state)
 
+    ### AJOUT ###: Profil calculé selon les processeurs, la RAM et les connexions PostgreSQL disponibles (si la connexion a été testée)
+    def recompute_tuning(self):
+        preflight = self.controller.state.db_preflight
+        available = preflight["available_connections"] if preflight else None
+        for key, value in build_profile(self.hardware["cpu"], self.hardware["ram_bytes"], available).items(): self.tuning_vars[key].set(value)
+        ram = f"{self.hardware['ram_bytes'] / 1024 ** 3:.1f} Go de RAM" if self.hardware["ram_bytes"] else "RAM inconnue"
+        limit = f", {available} connexions PostgreSQL disponibles" if available is not None else " (testez la connexion pour tenir compte de PostgreSQL)"
+        self.hardware_label.config(text=f"Machine : {self.hardware['cpu']} processeur(s), {ram}{limit}")
+
+    def read_tuning(self):
+        # Retourne le profil saisi, ou None si une valeur numérique n'est pas un entier positif
+        try: tuning = {key: var.get() for key, var in self.tuning_vars.items()}
+        except tk.TclError: return None
+        return tuning if all(value > 0 for value in tuning.values() if isinstance(value, int)) else None
+
     def _ensure_package(self, package_name, import_name):
+        import importlib
         try: return importlib.import_module(import_name)
         except ImportError:
             if messagebox.askyesno( "Dépendance Manquante", f"Le module Python '{import_name}' est requis mais non installé.\nVoulez-vous tenter de l'installer (via 'pip install {package_name}') ?"):
@@ -329,19 +381,44 @@ class ConfigPage(WizardPage):
             return None
 
     def test_db_connection(self):
+        from db_tools import db_preflight, planned_connections
         psycopg2 = self._ensure_package('psycopg2-binary', 'psycopg2')
         if not psycopg2:
             if messagebox.askokcancel("Continuer ?", "Le test de connexion a été annulé car 'psycopg2' n'est pas disponible.\nVoulez-vous continuer sans valider ?"):
                 self.next_button.config(state="normal")
             return
-        try:
-            conn = psycopg2.connect(dbname=self.db_vars["dbname"].get(), user=self.db_vars["user"].get(), password=self.db_vars["password"].get(), host=self.db_vars["host"].get(), port=self.db_vars["port"].get(), connect_timeout=3)
-            conn.close()
-            messagebox.showinfo("Succès", "Connexion à PostgreSQL réussie.")
-            self.next_button.config(state="normal")
-        except Exception as e:
-            messagebox.showerror("Échec de la Connexion", f"Impossible de se connecter à PostgreSQL.\nVérifiez les paramètres et le pare-feu.\n\nErreur: {e}")
+        ### MODIFICATION ###: Pré-vérification des performances (latence, réglages du serveur) hors du thread Tk
+        params = {"dbname": self.db_vars["dbname"].get(), "user": self.db_vars["user"].get(), "password": self.db_vars["password"].get(),
+                  "host": self.db_vars["host"].get(), "port": self.db_vars["port"].get()}
+        tuning = self.read_tuning()
+        if tuning: params["plan"] = planned_connections(tuning)
+        self.db_test_button.config(state="disabled", text="Vérification...")
+        def worker():
+            try: report, error = db_preflight(**params), None
+            except Exception as e: report, error = None, e
+            self.after(0, lambda: self.on_db_preflight_done(report, error))
+        threading.Thread(target=worker, daemon=True).start()
+
+    def on_db_preflight_done(self, report, error):
+        from db_tools import format_preflight, planned_connections, check_connections
+        self.db_test_button.config(state="normal", text="Tester la Connexion")
+        if error is not None:
+            messagebox.showerror("Échec de la Connexion", f"Impossible de se connecter à PostgreSQL.\nVérifiez les paramètres et le pare-feu.\n\nErreur: {error}")
             self.next_button.config(state="disabled")
+            return
+        self.controller.state.db_preflight = report
+        self.next_button.config(state="normal")
+        tuning = self.read_tuning()
+        if tuning is None or connections_needed(tuning) > report["available_connections"]:
+            self.recompute_tuning()
+            # Le constat sur les connexions portait sur l'ancien profil : réévalué pour le profil recalculé
+            tuning = self.read_tuning()
+            check_connections(report, planned_connections(tuning))
+            report["flags"].append(("warning", f"Profil de performance ramené à {connections_needed(tuning)} connexions pour tenir dans la limite du serveur."))
+        if report["flags"]:
+            messagebox.showwarning("Connexion réussie - points à vérifier", "Connexion à PostgreSQL réussie, mais des réglages sont sous-dimensionnés :\n\n" + format_preflight(report))
+        else:
+            messagebox.showinfo("Succès", "Connexion à PostgreSQL réussie.\n\n" + format_preflight(report))
 
     def save_and_continue(self):
         config = self.controller.state.config
@@ -376,6 +453,10 @@ class ConfigPage(WizardPage):
         config.update({f"db_{key}": var.get() for key, var in self.db_vars.items()})
         config.update({f"biostar_{key}": var.get() for key, var in self.biostar_vars.items()})
         config['redis_port'] = self.redis_port_var.get()
+        config['tuning'] = self.read_tuning()
+        if config['tuning'] is None:
+            messagebox.showwarning("Profil de Performance", "Les valeurs numériques du profil de performance doivent être des entiers positifs.")
+            return
 
         if not all([config.get('biostar_url'), config.get('biostar_login')]):
             messagebox.showwarning("Champs Manquants", "Les informations pour BioStar 2 sont requises.")
@@ -393,7 +474,7 @@ class InstallProgressPage(WizardPage):
         self.title.pack(pady=10)
         self.progress = ttk.Progressbar(self, orient="horizontal", length=100, mode="determinate")
         self.progress.pack(fill="x", padx=40, pady=10)
-        self.log_text = tk.Text(self, wrap="none", state="disabled", font=("Consolas", 9), relief=tk.SOLID, borderwidth=1)
+        self.log_text = SpooledLog(self, spool_prefix="install_", wrap="none", font=("Consolas", 9), relief=tk.SOLID, borderwidth=1)
         self.log_text.pack(fill="both", expand=True, padx=40, pady=10)
         self.log_text.tag_configure("SUCCESS", foreground="green"); self.log_text.tag_configure("ERROR", foreground="red"); self.log_text.tag_configure("STEP", foreground="blue", font=("Consolas", 9, "bold"))
         self.button_frame = ttk.Frame(self)
@@ -407,17 +488,10 @@ class InstallProgressPage(WizardPage):
         self.install_button.config(state="normal"); self.next_button.config(state="disabled")
 
     def log(self, message, level="INFO"):
-        self.log_text.config(state="normal")
-        self.log_text.insert("end", f"[{datetime.now():%H:%M:%S}] {message}\n", level)
-        self.log_text.config(state="disabled"); self.log_text.see("end"); self.update_idletasks()
+        self.log_text.write(f"[{datetime.now():%H:%M:%S}] {message}\n", level)
 
-    def _execute(self, command, description, **kwargs):
-        self.log(f"Exécution: {description}...")
-        try:
-            subprocess.run(command, capture_output=True, text=True, encoding='utf-8', errors='replace', check=True, shell=True, **kwargs)
-            self.log(f"Succès: {description}.", "SUCCESS")
-        except subprocess.CalledProcessError as e:
-            raise Exception(f"Échec de '{description}'. Erreur:\n{e.stderr or e.stdout}")
+    def set_progress(self, value):
+        self.progress['value'] = value
 
     def start_installation(self):
         self.install_button.config(state="disabled")
@@ -427,72 +501,12 @@ class InstallProgressPage(WizardPage):
         self.controller.state.install_path = install_path
         threading.Thread(target=self.run_install_logic, daemon=True).start()
 
+    ### MODIFICATION ###: La logique d'installation est dans provisioning_engine.InstallEngine (utilisable sans interface)
     def run_install_logic(self):
+        from provisioning_engine import InstallEngine
         try:
-            state = self.controller.state; config = state.config; install_path = state.install_path
-            self.log("Démarrage de l'installation...")
-            os.makedirs(install_path, exist_ok=True)
-            
-            # --- 1. Clonage ---
-            self.progress['value'] = 10; self.log("Étape 1: Clonage des dépôts...", "STEP")
-            full_backend_path = os.path.join(install_path, "backend"); full_frontend_path = os.path.join(install_path, "frontend")
-            pat = config.get('pat')
-            def build_clone_url(base_url): return f"https://{pat}@{base_url[8:]}" if pat and base_url.startswith("https://") else base_url
-            for name, url, path in [("Backend", config['backend_url'], full_backend_path), ("Frontend", config['frontend_url'], full_frontend_path)]:
-                if os.path.exists(os.path.join(path, ".git")): self._execute(f'git -C "{path}" pull', f"Mise à jour {name}")
-                else: self._execute(f'git clone "{build_clone_url(url)}" "{path}"', f"Clonage {name}")
-            
-            # --- 2. Génération .env ---
-            self.progress['value'] = 20; self.log("Étape 2: Génération du fichier de configuration .env...", "STEP")
-            secret_key = ''.join(random.choices(string.ascii_letters + string.digits + string.punctuation, k=60)).replace("'", "s").replace('"', 's').replace('`', 's')
-            db_url = f"postgres://{config['db_user']}:{config['db_password']}@{config['db_host']}:{config['db_port']}/{config['db_dbname']}"
-            env_content = (f"DJANGO_SECRET_KEY='{secret_key}'\nDJANGO_DEBUG=False\nALLOWED_HOSTS={config['allowed_hosts']}\nDATABASE_URL='{db_url}'\n"
-                           f"CORS_ALLOWED_ORIGINS=http://{config['allowed_hosts'].split(',')[0].strip()}:3000,https://{config['allowed_hosts'].split(',')[0].strip()}\n"
-                           f"CELERY_BROKER_URL='redis://localhost:{config['redis_port']}/0'\nCELERY_RESULT_BACKEND='redis://localhost:{config['redis_port']}/0'\n"
-                           f"BIOSTAR_API_BASE_URL={config['biostar_url']}\nBIOSTAR_ADMIN_LOGIN_ID={config['biostar_login']}\n"
-                           f"BIOSTAR_ADMIN_PASSWORD='{config['biostar_password']}'\n"
-                           f"MOCK_BIOSTAR_API=False")
-            with open(os.path.join(full_backend_path, ".env"), "w", encoding="utf-8") as f: f.write(env_content)
-
-            # --- 3. Dépendances ---
-            self.progress['value'] = 40; self.log("Étape 3: Installation des dépendances...", "STEP")
-            venv_path = os.path.join(full_backend_path, "venv")
-            if not os.path.exists(venv_path): self._execute(f'"{sys.executable}" -m venv "{venv_path}"', "Création de l'environnement virtuel Python")
-            pip_in_venv = os.path.join(venv_path, 'Scripts', 'pip.exe')
-            self._execute(f'"{pip_in_venv}" install -r requirements.txt', "Paquets Python (pip)", cwd=full_backend_path)
-            self._execute('npm install', "Paquets JavaScript (npm)", cwd=full_frontend_path)
-            
-            # --- 4. Migrations ---
-            self.progress['value'] = 70; self.log("Étape 4: Initialisation de la base de données...", "STEP")
-            backend_env = {**os.environ, **{k.strip(): v.strip().strip("'\"") for k, v in [line.split('=', 1) for line in env_content.splitlines() if '=' in line]}}
-            python_in_venv = os.path.join(venv_path, 'Scripts', 'python.exe')
-            self._execute(f'"{python_in_venv}" manage.py migrate', "Migrations Django", cwd=full_backend_path, env=backend_env)
-            
-            # ### MODIFICATION ###: L'étape de création du super-utilisateur est maintenant entièrement conditionnelle
-            if config.get('create_superuser', False):
-                self.progress['value'] = 80; self.log("Étape 5: Création du super-utilisateur...", "STEP")
-                superuser_env = {**backend_env, 'DJANGO_SUPERUSER_USERNAME': config['superuser_username'], 'DJANGO_SUPERUSER_EMAIL': config['superuser_email'],
-                                 'DJANGO_SUPERUSER_PASSWORD': config['superuser_password'], 'DJANGO_SUPERUSER_FIRST_NAME': config['superuser_first_name'],
-                                 'DJANGO_SUPERUSER_LAST_NAME': config['superuser_last_name']}
-                try:
-                    self._execute(f'"{python_in_venv}" manage.py createsuperuser --noinput', "Création du compte administrateur Django", cwd=full_backend_path, env=superuser_env)
-                except Exception as e:
-                    error_str = str(e).lower()
-                    # ### MODIFICATION ###: Gestion améliorée des erreurs d'existence
-                    if 'already exists' in error_str or 'already taken' in error_str:
-                        self.log(f"AVERTISSEMENT: Le super-utilisateur (ou son email) '{config['superuser_username']}' existe déjà. Création ignorée.", "SUCCESS")
-                    else:
-                        raise Exception(f"Échec de la création du super-utilisateur. Erreur:\n{e}")
-            else:
-                self.log("Étape 5: Création du super-utilisateur ignorée (option désactivée).", "STEP")
-
-
-            # --- 6. Build Frontend ---
-            self.progress['value'] = 90; self.log("Étape 6: Compilation du Frontend...", "STEP")
-            self._execute('npm run build', "Build du frontend", cwd=full_frontend_path)
-
-            self.progress['value'] = 100
-            self.log("INSTALLATION DE BASE TERMINÉE AVEC SUCCÈS!", "SUCCESS")
+            state = self.controller.state
+            InstallEngine(state.config, state.install_path, log=self.log, progress=self.set_progress).run()
             self.next_button.config(state="normal")
             
         except Exception as e:
@@ -521,6 +535,7 @@ class FinishPage(WizardPage):
 # Point d'entrée de l'application
 # =============================================================================
 if __name__ == "__main__":
+    import ctypes
     try:
         if not ctypes.windll.shell32.IsUserAnAdmin():
             if messagebox.askyesno("Droits Administrateur Requis", "Cet assistant fonctionne mieux avec des droits administrateur.\nVoulez-vous le redémarrer en tant qu'administrateur ?"):
@@ -529,4 +544,5 @@ if __name__ == "__main__":
     except Exception: pass
     
     app = InstallerWizard()
+    STARTUP.watch_first_paint(app)
     app.mainloop()
@@ -7,12 +7,18 @@
 #   - MODIFICATION: Utilise `waitress` comme serveur de production pour le backend au lieu de `runserver`.
 
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog, scrolledtext
+from tkinter import ttk, messagebox, filedialog
 import subprocess
 import os
 import re
-import time
 import threading
+import queue
+from datetime import datetime
+from spooled_log import SpooledLog
+from tuning_profile import read_profile
+from process_state import ProcessTracker, process_identities
+from service_probes import READY_TIMEOUTS, service_checks, wait_ready
+from service_supervisor import ServiceSupervisor
 
 class ServiceManager(tk.Tk):
     def __init__(self, *args, **kwargs):
@@ -25,41 +31,87 @@ class ServiceManager(tk.Tk):
         self.log_dir = None
         self.is_configured = False
         self.backend_env = None
+        self.readiness = {} # clé -> complément d'état ("démarrage...", "prêt en 1.2 s"...)
+        ### AJOUT ###: Surveillance en arrière-plan ; les changements arrivent par self.events, lue par poll_events()
+        self.events = queue.Queue()
+        self.launch_specs = {} # clé -> (commande, dossier, environnement) utilisée pour les redémarrages
+        self.log_offsets = {} # clé -> position dans le log où commence la sortie du lancement en cours
+        self.processes = ProcessTracker(on_exit=lambda key, code: self.supervisor.notify_exit(key, code))
+        self.supervisor = ServiceSupervisor(self.processes, self._respawn, self.events)
+        self.supervisor.start()
+        self._polls = 0
 
         self.create_widgets()
         self.protocol("WM_DELETE_WINDOW", self.on_close)
         self.toggle_controls('init')
+        self.after(250, self.poll_events)
 
     # ... (les fonctions de gestion de PID et de logs restent identiques) ...
     def _get_pid_path(self, service_key): return os.path.join(self.pid_dir, f"{service_key}.pid")
     def _get_log_path(self, service_key): return os.path.join(self.log_dir, f"{service_key}.log")
-    def _write_pid(self, service_key, pid):
-        with open(self._get_pid_path(service_key), 'w') as f: f.write(str(pid))
+    ### MODIFICATION ###: Le fichier .pid contient aussi l'identité du processus (heure de création) : "PID IDENTITÉ"
+    def _write_pid(self, service_key, pid, identity=None):
+        with open(self._get_pid_path(service_key), 'w') as f: f.write(f"{pid} {identity or ''}".strip())
     def _read_pid(self, service_key):
         try:
-            with open(self._get_pid_path(service_key), 'r') as f: return int(f.read().strip())
-        except (IOError, ValueError): return None
+            with open(self._get_pid_path(service_key), 'r') as f: parts = f.read().split()
+            return int(parts[0]), (parts[1] if len(parts) > 1 else None)
+        except (IOError, ValueError, IndexError): return None, None
     def _delete_pid(self, service_key):
         if os.path.exists(self._get_pid_path(service_key)): os.remove(self._get_pid_path(service_key))
-    def is_process_running(self, pid):
-        try:
-            si = subprocess.STARTUPINFO(); si.wShowWindow = subprocess.SW_HIDE; si.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            output = subprocess.check_output(f'tasklist /FI "PID eq {pid}"', stderr=subprocess.STDOUT, text=True, startupinfo=si)
-            return str(pid) in output
-        except subprocess.CalledProcessError: return False
-        
+
+    ### MODIFICATION ###: État lu par process_state (handles Popen + un relevé via l'API du système) au lieu d'un `tasklist` par service
     def sync_ui_with_pids(self):
         if not self.is_configured: return
+        adopted = []
+        for key in self.service_widgets:
+            if not self.processes.is_tracked(key):
+                pid, identity = self._read_pid(key)
+                if pid: self.processes.adopt(key, pid, identity); adopted.append(key)
+        self.processes.refresh()
+        for key in adopted:
+            # Service lancé lors d'une session précédente du lanceur : surveillé lui aussi
+            if self.processes.is_running(key): self.launch_specs[key] = self.get_command(key); self.supervisor.watch(key)
         for key, widgets in self.service_widgets.items():
-            pid = self._read_pid(key)
-            if pid and self.is_process_running(pid):
-                widgets['status'].config(text=f"En cours (PID: {pid})", foreground="green")
+            pid = self.processes.pid(key)
+            stats = self.supervisor.stats(key)
+            if pid and self.processes.is_running(key):
+                workers = self.backend_workers() if key == "backend" else []
+                pids = f"PID: {pid}" + (f", {len(workers)} workers" if workers else "")
+                widgets['status'].config(text=f"En cours ({pids}){self.readiness.get(key, '')}{self._format_stats(stats)}", foreground="green")
+                widgets['start'].config(state='disabled'); widgets['stop'].config(state='normal'); widgets['view_log'].config(state='normal')
+            elif stats.get('watched') and not stats.get('gave_up'):
+                # Sortie inattendue : le superviseur relance le service
+                widgets['status'].config(text=f"Arrêté (code {stats.get('last_exit_code')}) - redémarrage automatique...", foreground="orange")
                 widgets['start'].config(state='disabled'); widgets['stop'].config(state='normal'); widgets['view_log'].config(state='normal')
             else:
-                self._delete_pid(key)
-                widgets['status'].config(text="Arrêté", foreground="red")
+                if stats.get('gave_up'): self.supervisor.unwatch(key)
+                self.processes.forget(key)
+                self._delete_pid(key); self.readiness.pop(key, None)
+                widgets['status'].config(text="Arrêté" + (f" (code {stats['last_exit_code']}, {stats['restarts']} redémarrage(s))" if stats.get('gave_up') else ""), foreground="red")
                 widgets['start'].config(state='normal'); widgets['stop'].config(state='disabled'); widgets['view_log'].config(state='normal' if os.path.exists(self._get_log_path(key)) else 'disabled')
 
+    def _format_stats(self, stats):
+        parts = []
+        if stats.get('uptime_s') is not None:
+            minutes, seconds = divmod(stats['uptime_s'], 60); hours, minutes = divmod(minutes, 60)
+            parts.append(f"actif depuis {hours} h {minutes:02d} min" if hours else f"actif depuis {minutes} min {seconds:02d} s")
+        if stats.get('restarts'): parts.append(f"{stats['restarts']} redémarrage(s), dernier code {stats.get('last_exit_code')}")
+        return "".join(f" - {part}" for part in parts)
+
+    def poll_events(self):
+        # Thread Tk : événements du superviseur, puis rafraîchissement de l'état (au plus toutes les 5 s sans événement)
+        changed = False
+        while True:
+            try: key, event, detail = self.events.get_nowait()
+            except queue.Empty: break
+            changed = True
+            self.output_log.write(f"[{datetime.now():%H:%M:%S}] {key} : {event} ({detail})\n")
+            if event == "restarted": self.wait_for_service(key)
+        self._polls += 1
+        if changed or self._polls % 20 == 0: self.sync_ui_with_pids()
+        self.after(250, self.poll_events)
+
     def create_widgets(self):
         main_frame = ttk.Frame(self, padding=10); main_frame.pack(fill="both", expand=True)
 
@@ -81,18 +133,18 @@ class ServiceManager(tk.Tk):
         self.backend_port_var = tk.StringVar(value="8000"); self.frontend_port_var = tk.StringVar(value="3000")
         ttk.Label(ports_tab, text="Port Backend (via Waitress):").grid(row=0, column=0, padx=5, pady=5)
         self.backend_port_entry = ttk.Entry(ports_tab, textvariable=self.backend_port_var, width=10); self.backend_port_entry.grid(row=0, column=1, padx=5, pady=5)
-        ttk.Label(ports_tab, text="Port Frontend (via http.server):").grid(row=0, column=2, padx=5, pady=5)
+        ttk.Label(ports_tab, text="Port Frontend (fichiers statiques):").grid(row=0, column=2, padx=5, pady=5)
         self.frontend_port_entry = ttk.Entry(ports_tab, textvariable=self.frontend_port_var, width=10); self.frontend_port_entry.grid(row=0, column=3, padx=5, pady=5)
         self.apply_ports_button = ttk.Button(ports_tab, text="Appliquer les Ports", command=self.apply_ports); self.apply_ports_button.grid(row=0, column=4, padx=20, pady=5)
 
         # --- Contenu Onglet Actions de Production ---
         ttk.Label(prod_actions_tab, text="Ces actions préparent le backend pour la production.").pack(anchor='w', pady=5)
         self.collectstatic_button = ttk.Button(prod_actions_tab, text="Lancer 'collectstatic'", command=self.run_collectstatic_manually); self.collectstatic_button.pack(anchor='w', pady=10)
-        self.output_log = scrolledtext.ScrolledText(prod_actions_tab, height=8, state='disabled', wrap=tk.WORD, font=("Consolas", 9)); self.output_log.pack(fill='x', expand=True)
+        self.output_log = SpooledLog(prod_actions_tab, spool_prefix="launcher_", height=8, wrap=tk.WORD, font=("Consolas", 9)); self.output_log.pack(fill='x', expand=True)
 
         # --- Contenu Onglet Contrôle des Services ---
         self.service_widgets = {}
-        services = {"backend": "Backend (Waitress)", "frontend": "Frontend (http.server)", "worker": "Celery Worker", "beat": "Celery Beat"}
+        services = {"backend": "Backend (Waitress)", "frontend": "Frontend (statique)", "worker": "Celery Worker", "beat": "Celery Beat"}
         services_tab.grid_columnconfigure(1, weight=1)
         for i, (key, name) in enumerate(services.items()):
             ttk.Label(services_tab, text=name, font=("Segoe UI", 10, "bold")).grid(row=i, column=0, padx=5, pady=5, sticky="w")
@@ -176,31 +228,64 @@ class ServiceManager(tk.Tk):
     def get_command(self, service_key):
         b_port = self.backend_port_var.get()
         f_port = self.frontend_port_var.get()
+        ### AJOUT ###: Profil de performance écrit dans .env par l'installateur (valeurs par défaut s'il est absent)
+        tuning = read_profile(self.backend_env or {})
         return {
-            "backend": ([self.python_venv, "-m", "waitress", f"--port={b_port}", "core.wsgi:application"], self.backend_dir, self.backend_env),
-            "frontend": ([self.python_venv, "-m", "http.server", f_port], self.frontend_build_dir, None),
-            "worker": ([self.python_venv, "-m", "celery", "-A", "core", "worker", "-l", "info", "-P", "eventlet"], self.backend_dir, self.backend_env),
+            "backend": (self.backend_command(b_port, tuning), self.backend_dir, self.backend_env),
+            "frontend": (self.frontend_command(f_port, tuning), self.frontend_build_dir, None),
+            "worker": ([self.python_venv, "-m", "celery", "-A", "core", "worker", "-l", "info", "-P", "eventlet",
+                        "-c", str(tuning['CELERY_WORKER_CONCURRENCY']), f"--prefetch-multiplier={tuning['CELERY_WORKER_PREFETCH_MULTIPLIER']}"], self.backend_dir, self.backend_env),
             "beat": ([self.python_venv, "-m", "celery", "-A", "core", "beat", "-l", "info", "--scheduler", "django_celery_beat.schedulers:DatabaseScheduler"], self.backend_dir, self.backend_env),
         }.get(service_key)
 
+    ### AJOUT ###: Moteur du backend choisi par BACKEND_ENGINE (.env) : waitress, processes (backend_server.py) ou uvicorn (ASGI)
+    def backend_command(self, port, tuning):
+        engine, workers = tuning['BACKEND_ENGINE'], tuning['BACKEND_WORKERS']
+        if engine == "uvicorn" and not os.path.exists(os.path.join(self.backend_dir, 'core', 'asgi.py')):
+            self.output_log.write("core/asgi.py introuvable : moteur 'processes' utilisé à la place d'uvicorn.\n"); engine = "processes"
+        if engine == "processes" and workers < 2: engine = "waitress"
+        if engine == "uvicorn":
+            return [self.python_venv, "-m", "uvicorn", "core.asgi:application", "--host", "0.0.0.0", f"--port={port}", f"--workers={workers}",
+                    f"--backlog={tuning['WAITRESS_BACKLOG']}", f"--limit-concurrency={tuning['WAITRESS_CONNECTION_LIMIT'] * workers}"]
+        options = [f"--threads={tuning['WAITRESS_THREADS']}", f"--connection-limit={tuning['WAITRESS_CONNECTION_LIMIT']}",
+                   f"--backlog={tuning['WAITRESS_BACKLOG']}", f"--channel-timeout={tuning['WAITRESS_CHANNEL_TIMEOUT']}"]
+        if engine == "processes":
+            server = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend_server.py")
+            return [self.python_venv, server, f"--port={port}", f"--workers={workers}", *options,
+                    f"--pid-dir={self.pid_dir}", f"--log-dir={self.log_dir}", "core.wsgi:application"]
+        return [self.python_venv, "-m", "waitress", f"--port={port}", *options, "core.wsgi:application"]
+
+    ### AJOUT ###: Frontend servi par static_server.py (cache HTTP, compression, mémoire) sauf si FRONTEND_SERVER=http.server
+    def frontend_command(self, port, tuning):
+        if tuning['FRONTEND_SERVER'] == "http.server": return [self.python_venv, "-m", "http.server", port]
+        server = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static_server.py")
+        return [self.python_venv, server, f"--port={port}", f"--root={self.frontend_build_dir}"]
+
+    def backend_workers(self):
+        # Workers du moteur "processes" : fichiers backend-worker-N.pid écrits par backend_server.py
+        entries = [self._read_pid(name[:-len(".pid")]) for name in os.listdir(self.pid_dir) if name.startswith("backend-worker-") and name.endswith(".pid")]
+        current = process_identities(pid for pid, _ in entries if pid)
+        return [pid for pid, identity in entries if pid and current.get(pid) is not None and (not identity or current[pid] == identity)]
+
+    def _delete_worker_pids(self):
+        for name in os.listdir(self.pid_dir):
+            if name.startswith("backend-worker-") and name.endswith(".pid"): self._delete_pid(name[:-len(".pid")])
+
     ### AJOUT: Exécution de commandes avec retour dans l'UI
     def _run_command_in_thread(self, command, cwd, description):
         def task():
-            self.output_log.config(state='normal')
-            self.output_log.delete('1.0', tk.END)
-            self.output_log.insert(tk.END, f"--- Exécution de '{description}' ---\n\n")
-            self.update_idletasks()
+            self.output_log.clear()
+            self.output_log.write(f"--- Exécution de '{description}' ---\n\n")
             try:
                 si = subprocess.STARTUPINFO(); si.wShowWindow = subprocess.SW_HIDE; si.dwFlags |= subprocess.STARTF_USESHOWWINDOW
                 process = subprocess.run(command, cwd=cwd, text=True, capture_output=True, check=True, env=self.backend_env, startupinfo=si)
-                self.output_log.insert(tk.END, process.stdout)
-                self.output_log.insert(tk.END, f"\n--- Commande '{description}' terminée avec succès ---")
+                self.output_log.write(process.stdout)
+                self.output_log.write(f"\n--- Commande '{description}' terminée avec succès ---")
             except subprocess.CalledProcessError as e:
-                self.output_log.insert(tk.END, e.stdout + e.stderr)
-                self.output_log.insert(tk.END, f"\n--- ERREUR lors de l'exécution de '{description}' ---")
+                self.output_log.write(e.stdout + e.stderr)
+                self.output_log.write(f"\n--- ERREUR lors de l'exécution de '{description}' ---")
             except Exception as e:
-                self.output_log.insert(tk.END, f"Erreur fatale: {e}")
-            self.output_log.config(state='disabled')
+                self.output_log.write(f"Erreur fatale: {e}")
         
         threading.Thread(target=task, daemon=True).start()
 
@@ -221,26 +306,63 @@ class ServiceManager(tk.Tk):
                     messagebox.showerror("Erreur Collectstatic", f"Échec de collectstatic. Le serveur ne démarrera pas.\n\nErreur:\n{e.stderr.decode('utf-8', 'ignore')}")
                     return
         
-        command, cwd, env = self.get_command(key)
-        log_file_path = self._get_log_path(key)
+        self.launch_specs[key] = self.get_command(key)
         try:
-            with open(log_file_path, 'wb') as log_file:
-                si = subprocess.STARTUPINFO(); si.wShowWindow = subprocess.SW_HIDE; si.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                proc = subprocess.Popen(command, cwd=cwd, env=env, stdout=log_file, stderr=subprocess.STDOUT, creationflags=subprocess.CREATE_NEW_PROCESS_GROUP, startupinfo=si)
-            
-            time.sleep(1.5)
-            if self.is_process_running(proc.pid): self._write_pid(key, proc.pid)
-            else: messagebox.showerror("Échec du Démarrage", f"Le service '{key}' n'a pas pu démarrer. Consultez le fichier de log.")
+            self._spawn(key, *self.launch_specs[key])
+            self.supervisor.watch(key)
+            self.wait_for_service(key)
         except Exception as e: messagebox.showerror("Erreur", f"Erreur lors du lancement de '{key}':\n{e}")
         self.sync_ui_with_pids()
 
+    # Sans Tk : appelé aussi depuis le thread du superviseur
+    def _spawn(self, key, command, cwd, env, append=False):
+        # Redémarrage : le log est complété, pas écrasé (il contient la trace du plantage)
+        with open(self._get_log_path(key), 'ab' if append else 'wb') as log_file:
+            if append: log_file.write(f"\n--- Redémarrage automatique ({datetime.now():%Y-%m-%d %H:%M:%S}) ---\n".encode("utf-8"))
+            self.log_offsets[key] = log_file.tell() # Les vérifications de disponibilité ignorent ce qui précède
+            si = subprocess.STARTUPINFO(); si.wShowWindow = subprocess.SW_HIDE; si.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+            proc = subprocess.Popen(command, cwd=cwd, env=env, stdout=log_file, stderr=subprocess.STDOUT, creationflags=subprocess.CREATE_NEW_PROCESS_GROUP, startupinfo=si)
+        self._write_pid(key, proc.pid, self.processes.track(key, proc))
+        return proc
+
+    def _respawn(self, key):
+        if key not in self.launch_specs: return False
+        self._spawn(key, *self.launch_specs[key], append=True)
+        return True
+
+    ### AJOUT ###: Disponibilité vérifiée dans un thread (port TCP, URL de santé, ligne du log) au lieu d'une attente fixe
+    def wait_for_service(self, key):
+        port = {"backend": self.backend_port_var.get(), "frontend": self.frontend_port_var.get()}.get(key)
+        health_url = (self.backend_env or {}).get("BOVO_HEALTH_URL") # Optionnel, ex. http://127.0.0.1:8000/api/health/
+        command = self.launch_specs.get(key, ([],))[0]
+        multi_process = any(str(arg).endswith("backend_server.py") for arg in command)
+        checks = service_checks(key, port, self._get_log_path(key), health_url, multi_process, self.log_offsets.get(key, 0))
+        self.readiness[key] = " - démarrage..."
+        pid = self.processes.pid(key)
+        def worker():
+            status, elapsed = wait_ready(checks, lambda: self.processes.pid(key) == pid and self.processes.is_running(key), READY_TIMEOUTS.get(key, 30))
+            self.after(0, lambda: self.on_service_ready(key, pid, status, elapsed))
+        threading.Thread(target=worker, daemon=True).start()
+
+    def on_service_ready(self, key, pid, status, elapsed):
+        if self.processes.pid(key) != pid: return # Arrêté (ou relancé) entre-temps
+        if status == "ready": self.readiness[key] = f" - prêt en {elapsed:.1f} s"
+        elif status == "timeout": self.readiness[key] = f" - sans réponse après {elapsed:.0f} s"
+        else:
+            self.readiness.pop(key, None)
+            messagebox.showerror("Échec du Démarrage", f"Le service '{key}' s'est arrêté pendant son démarrage. Consultez le fichier de log.")
+        self.sync_ui_with_pids()
+
     # ... (stop_service, view_log, on_close restent identiques) ...
     def stop_service(self, key):
-        pid = self._read_pid(key)
+        self.supervisor.unwatch(key)
+        pid = self.processes.pid(key) or self._read_pid(key)[0]
         if pid:
             try: subprocess.run(f"taskkill /F /PID {pid} /T", check=True, capture_output=True)
             except subprocess.CalledProcessError: pass
-            self._delete_pid(key)
+            self.processes.forget(key)
+            self._delete_pid(key); self.readiness.pop(key, None)
+            if key == "backend": self._delete_worker_pids()
         self.sync_ui_with_pids()
     def view_log(self, key):
         log_path = self._get_log_path(key)
@@ -248,7 +370,7 @@ class ServiceManager(tk.Tk):
             try: os.startfile(log_path)
             except Exception as e: messagebox.showerror("Erreur", f"Impossible d'ouvrir le fichier de log:\n{e}")
         else: messagebox.showinfo("Info", "Le fichier de log n'existe pas encore. Démarrez le service d'abord.")
-    def on_close(self): self.destroy()
+    def on_close(self): self.supervisor.stop(); self.destroy()
 
 if __name__ == "__main__":
     app = ServiceManager()
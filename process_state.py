@@ -0,0 +1,116 @@
+# process_state.py
+# État des processus des services, sans lancer `tasklist` (utilisé par lancer_application_gui.py).
+# - Services démarrés par le lanceur : le handle Popen est conservé et un thread attend sa fin (proc.wait) ;
+#   la sortie et son code sont connus immédiatement, sans interrogation périodique.
+# - PID repris d'un fichier .pid (lanceur redémarré) : un relevé par rafraîchissement, via l'API du système,
+#   à raison d'une requête par PID (OpenProcess/GetProcessTimes sous Windows, /proc ailleurs). Les services sont
+#   peu nombreux : pas d'instantané de tous les processus du système (CreateToolhelp32Snapshot).
+# - Identité : l'heure de création du processus est enregistrée avec le PID ; un PID réattribué par le système
+#   à un autre programme n'est donc pas pris pour le service.
+
+import os
+import threading
+
+# =============================================================================
+# Identité d'un processus (heure de création) par l'API du système
+# =============================================================================
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+STILL_ACTIVE = 259
+
+def _windows_identity(pid):
+    import ctypes
+    from ctypes import wintypes
+    kernel32 = ctypes.windll.kernel32
+    handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+    if not handle: return None
+    try:
+        code = wintypes.DWORD()
+        if not kernel32.GetExitCodeProcess(handle, ctypes.byref(code)) or code.value != STILL_ACTIVE: return None
+        created, exited, kernel, user = (wintypes.FILETIME() for _ in range(4))
+        if not kernel32.GetProcessTimes(handle, ctypes.byref(created), ctypes.byref(exited), ctypes.byref(kernel), ctypes.byref(user)): return None
+        return str((created.dwHighDateTime << 32) | created.dwLowDateTime)
+    finally:
+        kernel32.CloseHandle(handle)
+
+def _proc_identity(pid):
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f: fields = f.read().rsplit(b")", 1)[1].split()
+    except (OSError, IndexError): return None
+    # fields[0] : état (Z = terminé, pas encore récupéré) ; fields[19] : heure de démarrage (starttime)
+    return None if fields[0] == b"Z" else fields[19].decode()
+
+def process_identity(pid):
+    # Jeton d'identité du processus `pid` ("" si le système ne permet pas de le connaître), None s'il n'existe pas
+    if not pid or pid <= 0: return None
+    if os.name == "nt": return _windows_identity(pid)
+    if os.path.isdir("/proc"): return _proc_identity(pid)
+    try: os.kill(pid, 0)
+    except ProcessLookupError: return None
+    except PermissionError: pass
+    return ""
+
+def process_identities(pids):
+    # {pid: identité ou None} pour les PID demandés, chacun interrogé séparément (voir process_identity)
+    return {pid: process_identity(pid) for pid in set(pids)}
+
+# =============================================================================
+# Suivi des services
+# =============================================================================
+class ProcessTracker:
+    def __init__(self, on_exit=None):
+        # `on_exit(clé, code)` est appelé depuis le thread d'attente lorsqu'un processus démarré ici se termine
+        self.on_exit = on_exit
+        self._lock = threading.Lock()
+        self._handles = {}   # clé -> Popen (démarré par le lanceur)
+        self._adopted = {}   # clé -> (pid, identité) (repris d'un fichier .pid)
+        self._alive = {}     # clé -> résultat du dernier relevé des PID repris
+        self._exit_codes = {}
+
+    def track(self, key, proc):
+        identity = process_identity(proc.pid)
+        with self._lock:
+            self._handles[key] = proc
+            self._adopted.pop(key, None); self._exit_codes.pop(key, None)
+        threading.Thread(target=self._wait, args=(key, proc), daemon=True).start()
+        return identity
+
+    def _wait(self, key, proc):
+        code = proc.wait()
+        with self._lock:
+            if self._handles.get(key) is not proc: return # Remplacé ou oublié entre-temps
+            self._exit_codes[key] = code
+        if self.on_exit: self.on_exit(key, code)
+
+    def adopt(self, key, pid, identity=None):
+        with self._lock:
+            if key in self._handles: return
+            self._adopted[key] = (pid, identity)
+
+    def forget(self, key):
+        with self._lock:
+            self._handles.pop(key, None); self._adopted.pop(key, None); self._alive.pop(key, None)
+
+    def refresh(self, keys=None):
+        # Relevé des PID repris (les processus démarrés ici sont suivis par leur thread d'attente)
+        with self._lock: adopted = {key: entry for key, entry in self._adopted.items() if keys is None or key in keys}
+        current = process_identities(pid for pid, _ in adopted.values())
+        with self._lock:
+            for key, (pid, identity) in adopted.items():
+                found = current.get(pid)
+                self._alive[key] = found is not None and (not identity or not found or found == identity)
+
+    def is_tracked(self, key):
+        with self._lock: return key in self._handles or key in self._adopted
+
+    def is_running(self, key):
+        with self._lock:
+            if key in self._handles: return key not in self._exit_codes
+            return self._alive.get(key, False)
+
+    def pid(self, key):
+        with self._lock:
+            if key in self._handles: return self._handles[key].pid
+            return self._adopted[key][0] if key in self._adopted else None
+
+    def exit_code(self, key):
+        with self._lock: return self._exit_codes.get(key)
@@ -0,0 +1,705 @@
+# provisioning_engine.py
+# Moteur de provisionnement sans interface graphique (n'importe pas tkinter).
+# - Contient la logique des deux assistants : prérequis (Chocolatey, outils, PostgreSQL) et installation
+#   de l'application (clonage, .env, dépendances, migrations, build). Les assistants Tk ne font que l'afficher.
+# - Mode sans surveillance : lit un fichier de réponses (mêmes clés que config.ini et InstallerState.config),
+#   provisionne plusieurs dossiers d'installation en parallèle et produit un rapport JSON par cible.
+#
+# Utilisation :
+#   python provisioning_engine.py reponses.ini [--workers 2] [--report rapport.json]
+
+import subprocess
+import threading
+import os
+import re
+import sys
+import random
+import string
+import time
+from datetime import datetime
+
+from choco_tools import take_inventory, plan_packages, parse_choco_result, local_source_option, local_bootstrap_command, ps_quote
+from db_tools import build_targets, has_driver, provision_with_driver, build_psql_script, find_psql
+from app_config import load_app_config
+from git_sync import clone_command, update_command, update_mirror, register_checkout, head_commit
+from dependency_cache import (build_wheelhouse, wheelhouse_install_command, requirement_count,
+                              lockfile_hash, lockfile_package_count, node_modules_current, npm_install_command, write_npm_stamp, file_digest)
+from django_bootstrap import bootstrap_command, RESULT_PREFIX
+from tuning_profile import PROFILE_KEYS, detect_hardware, build_profile, read_profile, profile_env_lines
+# configparser, json et concurrent.futures ne servent qu'au chargement de la configuration et au mode sans surveillance :
+# ils sont importés à la demande pour ne pas ralentir le démarrage des assistants.
+
+NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+# =============================================================================
+# Configuration : config.ini et fichier de réponses
+# =============================================================================
+INT_KEYS = {"db_port", "redis_port", "git_depth", "git_timeout"}
+BOOL_KEYS = {"create_superuser", "git_single_branch", "git_mirror", "wheelhouse"}
+
+def _section_config(section, defaults):
+    config = dict(defaults)
+    for key, value in section.items():
+        if key in INT_KEYS: config[key] = int(value)
+        elif key in BOOL_KEYS: config[key] = section.getboolean(key)
+        else: config[key] = value
+    return config
+
+def read_answer_file(path):
+    # [Repositories]/[Application] : comme config.ini
+    # [Install]                    : valeurs communes (clés de InstallerState.config + install_path)
+    # [Target:<nom>]               : une cible par section, surcharge [Install] (au minimum install_path)
+    # [Prereqs]                    : optionnel, tools / local_cache_dir / postgres_admin_password / db_name / db_user / db_pass
+    import configparser
+    parser = configparser.ConfigParser(interpolation=None)
+    if not parser.read(path, encoding="utf-8"):
+        raise FileNotFoundError(f"Fichier de réponses introuvable : {path}")
+    base = load_app_config(path)
+    base.update({"superuser_last_name": "", "create_superuser": False, "pat": ""})
+    if parser.has_section("Install"): base = _section_config(parser["Install"], base)
+    if base.get("create_superuser") and not base.get("superuser_first_name"):
+        base["superuser_first_name"] = base.get("superuser_username", "")
+
+    targets = []
+    for name in parser.sections():
+        if name.startswith("Target:"):
+            targets.append((name.split(":", 1)[1].strip(), _section_config(parser[name], base)))
+    if not targets and base.get("install_path"):
+        targets.append(("default", base))
+    for name, config in targets:
+        missing = [key for key in ["install_path", "db_dbname", "db_user", "db_password", "biostar_url", "biostar_login"] if not config.get(key)]
+        if missing: raise ValueError(f"Cible '{name}' : clés manquantes {', '.join(missing)}")
+
+    prereqs = dict(parser["Prereqs"]) if parser.has_section("Prereqs") else None
+    return prereqs, targets
+
+# =============================================================================
+# Prérequis : construction des commandes (partagées avec install_prereqs_gui.py)
+# =============================================================================
+CHOCO_BOOTSTRAP_COMMAND = (
+    "Set-ExecutionPolicy Bypass -Scope Process -Force; "
+    "[System.Net.ServicePointManager]::SecurityProtocol = [System.Net.ServicePointManager]::SecurityProtocol -bor 3072; "
+    "iex ((New-Object System.Net.WebClient).DownloadString('https://community.chocolatey.org/install.ps1'))"
+)
+
+# Recharge le PATH machine/utilisateur (ex. après l'installation de Chocolatey) sans relancer l'assistant
+REFRESH_ENV_COMMAND = (
+    "$env:ChocolateyInstall = [Environment]::GetEnvironmentVariable('ChocolateyInstall', 'Machine'); "
+    "$env:Path = [Environment]::GetEnvironmentVariable('Path', 'Machine') + ';' + [Environment]::GetEnvironmentVariable('Path', 'User')"
+)
+
+def refresh_process_path():
+    import winreg
+    paths = []
+    for root, key in [(winreg.HKEY_LOCAL_MACHINE, r"SYSTEM\CurrentControlSet\Control\Session Manager\Environment"), (winreg.HKEY_CURRENT_USER, "Environment")]:
+        try:
+            with winreg.OpenKey(root, key) as handle: paths.append(os.path.expandvars(winreg.QueryValueEx(handle, "Path")[0]))
+        except OSError: pass
+    if paths: os.environ["PATH"] = ";".join(paths)
+
+def choco_bootstrap_command(cache_dir=None):
+    return local_bootstrap_command(cache_dir) if cache_dir else CHOCO_BOOTSTRAP_COMMAND
+
+def choco_upgrade_command(packages, cache_dir=None):
+    # `upgrade` installe aussi les paquets absents
+    return f"choco upgrade {' '.join(packages)} -y --no-progress{local_source_option(cache_dir)}"
+
+def postgres_install_command(admin_pass, cache_dir=None):
+    # Le mot de passe n'est utilisé que lors de la première installation ; ensuite la commande est ignorée.
+    return f"choco install postgresql14 --params '\"/Password:{admin_pass}\"' -y{local_source_option(cache_dir)}"
+
+def psql_provision_command(script_path, admin_pass):
+    return f"$env:PGPASSWORD={ps_quote(admin_pass)}; & {ps_quote(find_psql())} -U postgres -h localhost -f {ps_quote(script_path)}"
+
+# =============================================================================
+# Prérequis : exécution sans interface
+# =============================================================================
+class PrereqEngine:
+    DEFAULT_TOOLS = ["git", "python", "nodejs-lts", "vscode"]
+
+    def __init__(self, options, log=None):
+        self.options = options or {}
+        self.log = log or (lambda message, level="INFO": print(message))
+        self.cache_dir = self.options.get("local_cache_dir") or None
+
+    def run_powershell(self, command, on_line=None):
+        self.log(f"Exécution de la commande :\n{command}", "CMD")
+        process = subprocess.Popen(['powershell.exe', '-NoProfile', '-Command', command], stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                   text=True, encoding='utf-8', errors='replace', creationflags=NO_WINDOW)
+        for line in iter(process.stdout.readline, ''):
+            if line.strip():
+                self.log(line.rstrip())
+                if on_line: on_line(line)
+        return process.wait() == 0
+
+    def ensure_choco(self):
+        import shutil
+        if shutil.which("choco"): return True
+        if not self.run_powershell(choco_bootstrap_command(self.cache_dir)): return False
+        try: refresh_process_path()
+        except Exception: pass
+        return shutil.which("choco") is not None
+
+    def plan_tools(self, tools):
+        # [(outil, "ok" | "install" | "upgrade", version installée)] ; inventaire impossible : tous les outils sont traités
+        try: return plan_packages(tools, take_inventory(tools))
+        except Exception as e:
+            self.log(f"Inventaire impossible ({e}), tous les outils cochés seront traités.", "ERROR")
+            return [(tool, "install", None) for tool in tools]
+
+    def tool_results(self, packages, reported, success):
+        # Sans ligne de résultat explicite pour un paquet, on se fie au code de retour global de Chocolatey
+        return {package: "success" if reported.get(package, success) else "error" for package in packages}
+
+    def install_tools(self, tools):
+        # Retourne {outil: "uptodate" | "success" | "error"}
+        results = {}
+        to_install = []
+        for package, action, version in self.plan_tools(tools):
+            if action == "ok": results[package] = "uptodate"
+            else: to_install.append(package)
+        if to_install:
+            reported = {}
+            def record(line):
+                result = parse_choco_result(line)
+                if result: reported[result[0]] = result[1]
+            success = self.run_powershell(choco_upgrade_command(to_install, self.cache_dir), on_line=record)
+            results.update(self.tool_results(to_install, reported, success))
+        return results
+
+    def postgres_version(self):
+        # Version de postgresql14 déjà installée si elle est suffisante (installation inutile), sinon None
+        from choco_tools import choco_lib_inventory, version_at_least, DESIRED_PACKAGES
+        installed = choco_lib_inventory().get("postgresql14")
+        if installed and version_at_least(installed, DESIRED_PACKAGES["postgresql14"]["min_version"]): return installed
+        return None
+
+    def write_psql_script(self, targets):
+        # Le script contient des mots de passe : l'appelant le supprime après usage
+        import tempfile
+        fd, script_path = tempfile.mkstemp(prefix="provision_", suffix=".sql")
+        with os.fdopen(fd, "w", encoding="utf-8") as f: f.write(build_psql_script(targets))
+        return script_path
+
+    def provision_postgres(self, admin_pass, db_name, db_user, db_pass):
+        installed = self.postgres_version()
+        if installed: self.log(f"postgresql14 : version {installed} déjà installée, installation ignorée.")
+        elif not self.run_powershell(postgres_install_command(admin_pass, self.cache_dir)): return False
+        targets = build_targets(db_name, db_user, db_pass)
+        if has_driver():
+            provision_with_driver(targets, admin_pass, log=self.log)
+            return True
+        script_path = self.write_psql_script(targets)
+        try:
+            return self.run_powershell(psql_provision_command(script_path, admin_pass))
+        finally:
+            os.remove(script_path)
+
+    def run(self):
+        report = {"choco": False, "tools": {}, "postgres": None, "success": False}
+        try:
+            report["choco"] = self.ensure_choco()
+            if not report["choco"]: return report
+            tools = [tool.strip() for tool in self.options.get("tools", ",".join(self.DEFAULT_TOOLS)).split(",") if tool.strip()]
+            report["tools"] = self.install_tools(tools)
+            if self.options.get("postgres_admin_password"):
+                report["postgres"] = self.provision_postgres(self.options["postgres_admin_password"], self.options.get("db_name", "rh_app_db"),
+                                                             self.options.get("db_user", "rh_app_user"), self.options.get("db_pass", ""))
+        except Exception as e:
+            # powershell.exe introuvable, erreur psycopg2, cibles invalides... : consigné dans le rapport
+            report["error"] = str(e)
+            self.log(f"ERREUR FATALE: {e}", "ERROR")
+            return report
+        report["success"] = "error" not in report["tools"].values() and report["postgres"] is not False
+        return report
+
+# =============================================================================
+# Exécuteur d'étapes à dépendances déclarées
+# =============================================================================
+class StepCancelled(Exception):
+    pass
+
+class StepGraph:
+    # Chaque étape déclare les étapes dont elle dépend ; les branches indépendantes s'exécutent en parallèle.
+    # La première erreur annule la suite : plus aucune étape n'est lancée, `on_cancel` interrompt celles en cours.
+    def __init__(self):
+        self.steps = {}
+
+    def add(self, name, label, action, after=(), weight=1, fingerprint=None):
+        # `fingerprint()` : empreinte des entrées de l'étape, évaluée une fois ses dépendances terminées (voir InstallJournal)
+        for dependency in after:
+            if dependency not in self.steps: raise ValueError(f"Étape '{name}' : dépendance inconnue '{dependency}'")
+        self.steps[name] = {"label": label, "action": action, "after": tuple(after), "weight": weight, "fingerprint": fingerprint}
+
+    def run(self, max_workers=4, on_start=None, on_done=None, on_cancel=None):
+        from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+        done, running, error = set(), {}, None
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            while True:
+                if error is None:
+                    for name, step in self.steps.items():
+                        if name in done or name in running.values() or not all(d in done for d in step["after"]): continue
+                        if on_start: on_start(name)
+                        running[pool.submit(step["action"])] = name
+                if not running: break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    failure = future.exception()
+                    if on_done: on_done(name, failure)
+                    if failure is None: done.add(name)
+                    elif error is None:
+                        error = failure
+                        if on_cancel: on_cancel()
+        if error is not None: raise error
+        return done
+
+# =============================================================================
+# Journal de reprise (dans le dossier d'installation)
+# =============================================================================
+def digest(*parts):
+    import hashlib
+    import json
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+class InstallJournal:
+    # Étape terminée -> empreinte de ses entrées (commit, hash de requirements, configuration...).
+    # Une étape dont l'empreinte n'a pas changé n'est pas rejouée lors d'une nouvelle tentative.
+    FILE_NAME = ".bovo_install_journal.json"
+
+    def __init__(self, install_path):
+        import json
+        self.path = os.path.join(install_path, self.FILE_NAME)
+        self.lock = threading.Lock()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f: self.entries = json.load(f).get("steps", {})
+        except (OSError, ValueError): self.entries = {}
+
+    def is_current(self, step, fingerprint):
+        entry = self.entries.get(step)
+        return entry is not None and entry.get("fingerprint") == fingerprint
+
+    def record(self, step, fingerprint):
+        with self.lock:
+            self.entries[step] = {"fingerprint": fingerprint, "completed": datetime.now().isoformat(timespec="seconds")}
+            self._save()
+
+    def forget(self, *steps):
+        with self.lock:
+            for step in steps: self.entries.pop(step, None)
+            self._save()
+
+    def _save(self):
+        import json
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f: json.dump({"steps": self.entries}, f, indent=2)
+        os.replace(temp_path, self.path) # Jamais de journal à moitié écrit
+
+# =============================================================================
+# Progression dans la sortie des outils
+# =============================================================================
+# Chaque analyseur reçoit une ligne et retourne None (ligne ordinaire) ou (avancement 0..1 ou None, afficher la ligne ?)
+GIT_PROGRESS = re.compile(r"^(?:remote: )?([A-Za-z ]+):\s+(\d+)% \(")
+GIT_PHASES = {"Receiving objects": (0.0, 0.7), "Resolving deltas": (0.7, 0.9), "Updating files": (0.9, 1.0)}
+PIP_ITEM = re.compile(r"^\s*(Collecting|Processing|Requirement already satisfied)\b")
+NPM_FETCH = re.compile(r"^npm (?:http fetch|HTTP) ")
+NPM_ADDED = re.compile(r"^(?:added|removed|changed) \d+ packages?")
+
+def git_progress():
+    def parse(line):
+        match = GIT_PROGRESS.search(line)
+        if not match: return None
+        # Seule la ligne finale de chaque phase ("..., done.") est journalisée ; les phases côté serveur n'avancent pas la barre
+        phase = GIT_PHASES.get(match.group(1))
+        fraction = phase[0] + (phase[1] - phase[0]) * int(match.group(2)) / 100 if phase else None
+        return fraction, line.endswith("done.")
+    return parse
+
+def pip_progress(expected):
+    # Les dépendances transitives ne sont pas connues d'avance : la collecte plafonne à 70 %
+    seen = [0]
+    def parse(line):
+        if PIP_ITEM.match(line):
+            seen[0] += 1
+            return 0.7 * min(1.0, seen[0] / max(1, expected)), True
+        if line.startswith("Installing collected packages"): return 0.8, True
+        if line.startswith("Successfully installed"): return 1.0, True
+        return None
+    return parse
+
+def npm_progress(expected):
+    fetched = [0]
+    def parse(line):
+        if NPM_FETCH.match(line):
+            fetched[0] += 1
+            return (0.9 * min(1.0, fetched[0] / expected) if expected else None), False
+        if NPM_ADDED.match(line): return 1.0, True
+        return None
+    return parse
+
+def django_progress(expected):
+    done = [0]
+    def parse(line):
+        if not line.startswith(RESULT_PREFIX): return None
+        done[0] += 1
+        return min(1.0, done[0] / max(1, expected)), False
+    return parse
+
+# =============================================================================
+# Installation de l'application (ex-InstallProgressPage.run_install_logic)
+# =============================================================================
+class InstallEngine:
+    OUTPUT_TAIL_LINES = 200 # Lignes conservées pour le message d'erreur
+
+    def __init__(self, config, install_path, log=None, progress=None, max_workers=4):
+        self.config = config
+        self.install_path = install_path
+        self.log = log or (lambda message, level="INFO": print(f"[{datetime.now():%H:%M:%S}] {message}"))
+        self.progress = progress or (lambda value: None)
+        self.max_workers = max_workers
+        self.steps = []
+        self.django_report = None
+        self.journal = None
+        self._skipped = set()
+        self._processes = set()
+        self._processes_lock = threading.Lock()
+        self.cancelled = threading.Event()
+        self._local = threading.local()      # Étape en cours dans le thread courant
+        self._weights, self._partial = {}, {}
+        self._progress_lock = threading.Lock()
+
+    ### MODIFICATION ###: Sortie lue ligne par ligne (journal en direct, mémoire bornée) ; `progress_parser` fait avancer l'étape
+    def execute(self, command, description, progress_parser=None, **kwargs):
+        from collections import deque
+        if self.cancelled.is_set(): raise StepCancelled(f"'{description}' annulé.")
+        self.log(f"Exécution: {description}...")
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, encoding='utf-8', errors='replace', shell=True,
+                                   start_new_session=os.name != "nt", **kwargs)
+        with self._processes_lock: self._processes.add(process)
+        tail = deque(maxlen=self.OUTPUT_TAIL_LINES)
+        try:
+            for line in iter(process.stdout.readline, ''):
+                line = line.rstrip()
+                if not line: continue
+                tail.append(line)
+                parsed = progress_parser(line) if progress_parser else None
+                if parsed is not None:
+                    fraction, show = parsed
+                    if fraction is not None: self.report_progress(fraction)
+                    if not show: continue
+                self.log(line)
+            process.wait()
+        finally:
+            process.stdout.close()
+            with self._processes_lock: self._processes.discard(process)
+        if self.cancelled.is_set(): raise StepCancelled(f"'{description}' annulé.")
+        if process.returncode != 0:
+            raise Exception(f"Échec de '{description}'. Erreur:\n" + "\n".join(tail))
+        self.log(f"Succès: {description}.", "SUCCESS")
+        return "\n".join(tail)
+
+    def report_progress(self, fraction, name=None):
+        # Avancement (0..1) d'une étape (par défaut celle du thread courant) ; la barre ne recule jamais
+        name = name or getattr(self._local, "step", None)
+        if name is None or name not in self._weights: return
+        with self._progress_lock:
+            self._partial[name] = max(self._partial.get(name, 0.0), min(1.0, fraction))
+            value = 100 * sum(self._weights[n] * f for n, f in self._partial.items()) / sum(self._weights.values())
+        self.progress(round(value))
+
+    def _bind_step(self, name, action, fingerprint=None):
+        def run_step():
+            self._local.step = name
+            try:
+                if fingerprint and self.journal.is_current(name, fingerprint()):
+                    self._skipped.add(name)
+                    self.log(f"Déjà faite lors d'une tentative précédente (entrées inchangées) : {name}.", "SUCCESS")
+                    return
+                action()
+                if fingerprint: self.journal.record(name, fingerprint())
+            finally: self._local.step = None
+        return run_step
+
+    def cancel(self):
+        # Appelé à la première erreur : les commandes encore en cours dans les autres branches sont arrêtées
+        self.cancelled.set()
+        with self._processes_lock: processes = list(self._processes)
+        for process in processes:
+            if os.name == "nt": # shell=True : tuer aussi l'arbre (npm, pip...) lancé par cmd.exe
+                subprocess.run(f"taskkill /F /T /PID {process.pid}", capture_output=True, creationflags=NO_WINDOW)
+            else:
+                import signal
+                try: os.killpg(process.pid, signal.SIGKILL)
+                except OSError: pass
+
+    ### MODIFICATION ###: Clonage / mise à jour d'un dépôt (options de la section [Git]) ; les deux dépôts sont des étapes indépendantes
+    def sync_repository(self, name, url, path, ref, commit=None):
+        # `commit` : commit publié relevé lors de la validation des dépôts (RepoPage)
+        config = self.config
+        pat = config.get('pat')
+        def build_clone_url(base_url): return f"https://{pat}@{base_url[8:]}" if pat and base_url.startswith("https://") else base_url
+        exists = os.path.exists(os.path.join(path, ".git"))
+        def pin_validated_commit():
+            # Dépôt aligné sur le commit validé si la branche a bougé entre-temps (--keep : modifications locales préservées)
+            if not commit or head_commit(path) == commit: return
+            try: self.execute(f'git -C "{path}" reset --keep --quiet {commit}', f"Alignement de {name} sur le commit validé {commit[:10]}")
+            except StepCancelled: raise
+            except Exception: self.log(f"AVERTISSEMENT: impossible d'extraire le commit validé {commit[:10]} ({name}) : dernier commit de la branche conservé.")
+        if exists and commit and head_commit(path) == commit:
+            self.log(f"{name} : déjà au commit publié {commit[:10]}, mise à jour inutile.", "SUCCESS")
+            return
+        # Le miroir local est mis à jour d'abord ; le dépôt de travail n'a plus qu'à lire le disque
+        mirror = update_mirror(build_clone_url(url), config.get('git_mirror_dir') or None, run=self.execute) if config.get('git_mirror') else ""
+        if exists:
+            self.execute(update_command(path, ref), f"Mise à jour {name}")
+            pin_validated_commit()
+            return
+        if mirror:
+            # Historique complet emprunté au miroir : profondeur et filtre n'apportent rien ici
+            self.execute(clone_command(build_clone_url(url), path, ref, single_branch=config.get('git_single_branch', False), reference=mirror),
+                         f"Clonage {name} (miroir local)", git_progress())
+            register_checkout(mirror, path)
+        else:
+            self.execute(clone_command(build_clone_url(url), path, ref, config.get('git_depth', 0), config.get('git_filter', ""),
+                                       config.get('git_single_branch', False)), f"Clonage {name}", git_progress())
+        pin_validated_commit()
+
+    def build_env(self, previous=None):
+        config = self.config
+        # Une clé déjà générée (installation précédente ou tentative interrompue) est conservée
+        match = re.search(r"^DJANGO_SECRET_KEY='([^'\n]+)'", previous or "", re.MULTILINE)
+        secret_key = match.group(1) if match else ''.join(random.choices(string.ascii_letters + string.digits + string.punctuation, k=60)).replace("'", "s").replace('"', 's').replace('`', 's')
+        ### AJOUT ###: Profil de performance : choix de ConfigPage, sinon valeurs du .env existant, sinon calcul selon la machine
+        hardware = detect_hardware()
+        previous_env = {k.strip(): v.strip() for k, v in [line.split('=', 1) for line in (previous or "").splitlines() if '=' in line]}
+        if config.get('tuning'): tuning = read_profile(config['tuning'])
+        elif all(key in previous_env for key in PROFILE_KEYS): tuning = read_profile(previous_env)
+        else: tuning = build_profile(hardware['cpu'], hardware['ram_bytes'])
+        db_url = f"postgres://{config['db_user']}:{config['db_password']}@{config['db_host']}:{config['db_port']}/{config['db_dbname']}"
+        return (f"DJANGO_SECRET_KEY='{secret_key}'\nDJANGO_DEBUG=False\nALLOWED_HOSTS={config['allowed_hosts']}\nDATABASE_URL='{db_url}'\n"
+                f"CORS_ALLOWED_ORIGINS=http://{config['allowed_hosts'].split(',')[0].strip()}:3000,https://{config['allowed_hosts'].split(',')[0].strip()}\n"
+                f"CELERY_BROKER_URL='redis://localhost:{config['redis_port']}/0'\nCELERY_RESULT_BACKEND='redis://localhost:{config['redis_port']}/0'\n"
+                f"BIOSTAR_API_BASE_URL={config['biostar_url']}\nBIOSTAR_ADMIN_LOGIN_ID={config['biostar_login']}\n"
+                f"BIOSTAR_ADMIN_PASSWORD='{config['biostar_password']}'\n"
+                f"MOCK_BIOSTAR_API=False\n\n{profile_env_lines(tuning, hardware)}\n")
+
+    def build_graph(self):
+        config = self.config; install_path = self.install_path
+        full_backend_path = os.path.join(install_path, "backend"); full_frontend_path = os.path.join(install_path, "frontend")
+        venv_path = os.path.join(full_backend_path, "venv")
+        python_in_venv = os.path.join(venv_path, 'Scripts', 'python.exe')
+        pip_in_venv = os.path.join(venv_path, 'Scripts', 'pip.exe')
+        env_path = os.path.join(full_backend_path, ".env")
+
+        def read_env():
+            try:
+                with open(env_path, "r", encoding="utf-8") as f: return f.read()
+            except OSError: return None
+
+        def write_env():
+            content = self.build_env(read_env())
+            with open(env_path, "w", encoding="utf-8") as f: f.write(content)
+
+        def backend_env():
+            # Lu sur disque : l'étape .env peut avoir été faite lors d'une tentative précédente
+            return {**os.environ, **{k.strip(): v.strip().strip("'\"") for k, v in [line.split('=', 1) for line in read_env().splitlines() if '=' in line]}}
+
+        def create_venv():
+            if not os.path.exists(venv_path): self.execute(f'"{sys.executable}" -m venv "{venv_path}"', "Création de l'environnement virtuel Python")
+
+        ### AJOUT ###: Mode wheelhouse : roues construites une fois par requirements/Python/plateforme, puis installation hors ligne
+        def install_python_packages():
+            requirements = os.path.join(full_backend_path, "requirements.txt")
+            expected = requirement_count(requirements)
+            if not config.get('wheelhouse'):
+                self.execute(f'"{pip_in_venv}" install -r requirements.txt', "Paquets Python (pip)", pip_progress(expected), cwd=full_backend_path)
+                return
+            wheelhouse = build_wheelhouse(requirements, python_in_venv, config.get('wheelhouse_dir') or None, config.get('pip_find_links', ""), run=self.execute)
+            self.execute(wheelhouse_install_command(python_in_venv, requirements, wheelhouse), "Paquets Python (wheelhouse local)", pip_progress(expected),
+                         cwd=full_backend_path)
+
+        ### AJOUT ###: npm ci + cache npm commun ; rien à faire si node_modules correspond déjà au lockfile
+        def install_js_packages():
+            expected = lockfile_hash(full_frontend_path)
+            if node_modules_current(full_frontend_path, expected):
+                self.log("Paquets JavaScript (npm) : node_modules correspond déjà au lockfile, étape ignorée.", "SUCCESS")
+                return
+            # --loglevel http : une ligne par paquet récupéré (réseau ou cache), comptée par rapport au lockfile
+            self.execute(npm_install_command(full_frontend_path, config.get('npm_cache_dir') or None) + " --loglevel http", "Paquets JavaScript (npm)",
+                         npm_progress(lockfile_package_count(full_frontend_path)), cwd=full_frontend_path)
+            write_npm_stamp(full_frontend_path, expected)
+
+        ### MODIFICATION ###: migrate, super-utilisateur, check --deploy et collectstatic dans un seul processus Django
+        def bootstrap_django():
+            import json
+            import tempfile
+            commands = ["migrate --noinput"]
+            run_env = backend_env()
+            if config.get('create_superuser', False):
+                commands.append("-createsuperuser --noinput")
+                run_env.update({'DJANGO_SUPERUSER_USERNAME': config['superuser_username'], 'DJANGO_SUPERUSER_EMAIL': config['superuser_email'],
+                                'DJANGO_SUPERUSER_PASSWORD': config['superuser_password'], 'DJANGO_SUPERUSER_FIRST_NAME': config['superuser_first_name'],
+                                'DJANGO_SUPERUSER_LAST_NAME': config['superuser_last_name']})
+            # Avertissements seulement : le lanceur propose de toute façon collectstatic avant de démarrer le backend
+            commands += ["-check --deploy", "-collectstatic --noinput"]
+            fd, report_path = tempfile.mkstemp(prefix="django_bootstrap_", suffix=".json"); os.close(fd)
+            failure, report = None, None
+            try:
+                try:
+                    self.execute(subprocess.list2cmdline(bootstrap_command(python_in_venv, commands, report=report_path)),
+                                 "Initialisation de Django (" + ", ".join(c.lstrip("-").split()[0] for c in commands) + ")", django_progress(len(commands)),
+                                 cwd=full_backend_path, env=run_env)
+                except StepCancelled:
+                    raise
+                except Exception as e:
+                    failure = e
+                try:
+                    with open(report_path, "r", encoding="utf-8") as f: report = json.load(f)
+                except (OSError, ValueError): pass
+            finally:
+                os.remove(report_path)
+            if report is None: raise failure or Exception("Rapport d'initialisation Django illisible.")
+            self.django_report = report
+
+            self.log(f"Django initialisé en {report['setup_s']} s.")
+            for result in report["commands"]:
+                name = result["command"]
+                if result["status"] == "ok":
+                    self.log(f"Succès: {name} ({result['duration_s']} s).", "SUCCESS")
+                elif result["status"] == "skipped":
+                    self.log(f"'{name}' non exécutée (commande précédente en échec).")
+                elif name.startswith("createsuperuser"):
+                    # Seul un compte déjà existant est toléré ; toute autre erreur (email invalide, variable manquante...) arrête l'installation
+                    details = f"{result['error']}\n{result.get('output', '')}".lower()
+                    if 'already exists' not in details and 'already taken' not in details:
+                        raise Exception(f"Échec de la création du super-utilisateur. Erreur:\n{result['error']}\n{result.get('output', '')}")
+                    self.log(f"AVERTISSEMENT: Le super-utilisateur (ou son email) '{config['superuser_username']}' existe déjà. Création ignorée.", "SUCCESS")
+                elif result["status"] == "ignored":
+                    self.log(f"AVERTISSEMENT: '{name}' : {result['error']}")
+                else:
+                    raise Exception(f"Échec de '{name}'. Erreur:\n{result['error']}\n{result['output']}")
+            if failure: raise failure
+
+        # Branche backend : clone -> (.env, venv -> pip) -> Django (migrate, super-utilisateur, check, collectstatic)
+        # Branche frontend : clone -> npm install -> build
+        ### AJOUT ###: Empreintes des entrées de chaque étape (journal de reprise)
+        env_keys = ["allowed_hosts", "db_host", "db_port", "db_dbname", "db_user", "db_password", "redis_port", "biostar_url", "biostar_login", "biostar_password"]
+        superuser_keys = ["create_superuser", "superuser_username", "superuser_email", "superuser_first_name", "superuser_last_name"]
+        # Les empreintes décrivent l'état réel (venv, node_modules, commit validé) : un venv supprimé puis recréé,
+        # ou un node_modules effacé, ne correspond plus à l'entrée du journal et l'étape est rejouée.
+        def clone_fingerprint(side, path): return lambda: digest(config[f'{side}_url'], config.get(f'{side}_ref', ""), config.get(f'{side}_commit'), head_commit(path))
+        def env_fingerprint(): return digest([config.get(key) for key in env_keys], config.get('tuning'), file_digest(env_path))
+        def venv_identity():
+            # pyvenv.cfg est écrit à la création du venv : sa date et son numéro de fichier changent à chaque recréation
+            try: stat = os.stat(os.path.join(venv_path, "pyvenv.cfg"))
+            except OSError: return None
+            return [stat.st_mtime_ns, stat.st_ino]
+        def venv_fingerprint(): return digest(sys.executable, venv_identity())
+        def pip_fingerprint():
+            return digest(file_digest(os.path.join(full_backend_path, "requirements.txt")), config.get('wheelhouse'), config.get('pip_find_links'), venv_identity())
+        def django_fingerprint(): return digest(head_commit(full_backend_path), file_digest(env_path), [config.get(key) for key in superuser_keys], pip_fingerprint())
+        def npm_fingerprint():
+            return digest(lockfile_hash(full_frontend_path), file_digest(os.path.join(full_frontend_path, "package.json")),
+                          os.path.isdir(os.path.join(full_frontend_path, "node_modules")), node_modules_current(full_frontend_path))
+        def build_fingerprint(): return digest(head_commit(full_frontend_path), npm_fingerprint(), os.path.isdir(os.path.join(full_frontend_path, "dist")))
+
+        graph = StepGraph()
+        graph.add("clone_backend", "Clonage du backend", lambda: self.sync_repository("Backend", config['backend_url'], full_backend_path, config.get('backend_ref', ""), config.get('backend_commit')),
+                  weight=10, fingerprint=clone_fingerprint("backend", full_backend_path))
+        graph.add("clone_frontend", "Clonage du frontend", lambda: self.sync_repository("Frontend", config['frontend_url'], full_frontend_path, config.get('frontend_ref', ""), config.get('frontend_commit')),
+                  weight=10, fingerprint=clone_fingerprint("frontend", full_frontend_path))
+        graph.add("env", "Génération du fichier de configuration .env", write_env, after=["clone_backend"], weight=1, fingerprint=env_fingerprint)
+        graph.add("venv", "Environnement virtuel Python", create_venv, after=["clone_backend"], weight=5, fingerprint=venv_fingerprint)
+        graph.add("pip", "Paquets Python (pip)", install_python_packages, after=["venv"], weight=25, fingerprint=pip_fingerprint)
+        graph.add("django", "Initialisation de la base de données et de Django", bootstrap_django, after=["pip", "env"], weight=13, fingerprint=django_fingerprint)
+        graph.add("npm_install", "Paquets JavaScript (npm)", install_js_packages, after=["clone_frontend"], weight=25, fingerprint=npm_fingerprint)
+        graph.add("build", "Compilation du Frontend", lambda: self.execute('npm run build', "Build du frontend", cwd=full_frontend_path),
+                  after=["npm_install"], weight=15, fingerprint=build_fingerprint)
+        return graph
+
+    def run(self):
+        self.log("Démarrage de l'installation...")
+        os.makedirs(self.install_path, exist_ok=True)
+        if not self.config.get('create_superuser', False):
+            self.log("Création du super-utilisateur ignorée (option désactivée).", "STEP")
+
+        ### MODIFICATION ###: Les étapes s'exécutent selon leurs dépendances ; la barre de progression est pondérée par étape
+        ### MODIFICATION ###: Reprise : les étapes déjà faites dont les entrées n'ont pas changé sont ignorées
+        self.journal = InstallJournal(self.install_path)
+        graph = self.build_graph()
+        self._weights = {name: step["weight"] for name, step in graph.steps.items()}
+        for name, step in graph.steps.items(): step["action"] = self._bind_step(name, step["action"], step["fingerprint"])
+        records, started = {}, {}
+
+        def on_start(name):
+            started[name] = time.monotonic()
+            records[name] = {"step": graph.steps[name]["label"]}
+            self.steps.append(records[name])
+            self.log(f"Étape: {graph.steps[name]['label']}...", "STEP")
+
+        def on_done(name, failure):
+            records[name]["duration_s"] = round(time.monotonic() - started[name], 3)
+            if name in self._skipped: records[name]["skipped"] = True
+            if failure is not None:
+                records[name]["failed"] = True
+                if isinstance(failure, StepCancelled): records[name]["cancelled"] = True
+                return
+            self.report_progress(1.0, name)
+
+        self.progress(0)
+        graph.run(self.max_workers, on_start, on_done, on_cancel=self.cancel)
+        # Installation complète : la prochaine exécution remet les dépôts à jour (les autres étapes suivent leurs empreintes)
+        self.journal.forget("clone_backend", "clone_frontend")
+        self.log("INSTALLATION DE BASE TERMINÉE AVEC SUCCÈS!", "SUCCESS")
+
+# =============================================================================
+# Mode sans surveillance : plusieurs cibles en parallèle
+# =============================================================================
+def run_target(name, config, log_lock=None):
+    log_lock = log_lock or threading.Lock()
+    def log(message, level="INFO"):
+        with log_lock: print(f"[{datetime.now():%H:%M:%S}] [{name}] {message}", file=sys.stderr, flush=True)
+    engine = InstallEngine(config, config["install_path"], log=log)
+    started = time.monotonic()
+    result = {"target": name, "install_path": config["install_path"], "success": False, "error": None}
+    try:
+        engine.run()
+        result["success"] = True
+    except Exception as e:
+        result["error"] = str(e)
+        log(f"ERREUR FATALE: {e}", "ERROR")
+    result["steps"] = engine.steps
+    result["django"] = engine.django_report
+    result["duration_s"] = round(time.monotonic() - started, 3)
+    return result
+
+def run_unattended(answer_file, workers=2):
+    from concurrent.futures import ThreadPoolExecutor
+    prereqs, targets = read_answer_file(answer_file)
+    report = {"started": datetime.now().isoformat(timespec="seconds"), "prereqs": None, "targets": []}
+    log_lock = threading.Lock()
+    if prereqs is not None:
+        def log(message, level="INFO"):
+            with log_lock: print(f"[{datetime.now():%H:%M:%S}] [prereqs] {message}", file=sys.stderr, flush=True)
+        report["prereqs"] = PrereqEngine(prereqs, log=log).run()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        report["targets"] = list(pool.map(lambda target: run_target(target[0], target[1], log_lock), targets))
+    prereqs_ok = report["prereqs"] is None or report["prereqs"]["success"]
+    report["success"] = prereqs_ok and all(result["success"] for result in report["targets"])
+    return report
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    parser = argparse.ArgumentParser(description="Provisionnement sans surveillance à partir d'un fichier de réponses.")
+    parser.add_argument("answer_file")
+    parser.add_argument("--workers", type=int, default=2, help="Nombre de cibles installées en parallèle")
+    parser.add_argument("--report", help="Fichier JSON de rapport (sinon, sortie standard)")
+    args = parser.parse_args()
+    report = run_unattended(args.answer_file, args.workers)
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f: f.write(output)
+    else:
+        print(output)
+    sys.exit(0 if report["success"] else 1)
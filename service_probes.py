@@ -0,0 +1,72 @@
+# service_probes.py
+# Vérifications de disponibilité des services lancés par lancer_application_gui.py (sans interface graphique).
+# - Backend / frontend : le port TCP accepte les connexions ; backend : URL de santé HTTP en option.
+# - Celery worker / beat : ligne caractéristique dans le fichier de log du service.
+# - Backend en plusieurs processus (backend_server.py) : en plus du port, marqueur « tous les workers ont chargé
+#   l'application » dans son log.
+# wait_ready() s'exécute dans un thread : le service est déclaré prêt dès que toutes ses vérifications passent,
+# en échec si le processus se termine, ou « sans réponse » à l'expiration du délai.
+
+import re
+import time
+
+READY_TIMEOUTS = {"backend": 60, "frontend": 20, "worker": 60, "beat": 30}
+LOG_PATTERNS = {
+    "worker": re.compile(r"celery@\S+ ready\."),
+    "beat": re.compile(r"beat: Starting\.\.\."),
+}
+BACKEND_READY = re.compile(r"^BOVO_BACKEND_READY\b", re.MULTILINE) # backend_server.READY_MARKER
+
+def tcp_check(port, host="127.0.0.1", timeout=0.5):
+    import socket
+    def check():
+        try:
+            with socket.create_connection((host, int(port)), timeout=timeout): return True
+        except OSError: return False
+    return check
+
+def http_check(url, timeout=2):
+    import urllib.request
+    import urllib.error
+    def check():
+        try:
+            with urllib.request.urlopen(url, timeout=timeout) as response: return response.status < 500
+        except urllib.error.HTTPError as e: return e.code < 500
+        except (OSError, ValueError): return False
+    return check
+
+def log_check(path, pattern, offset=0):
+    # Relit seulement la partie du log ajoutée depuis le dernier passage. `offset` : début du lancement en cours
+    # (après un redémarrage, le log contient encore la ligne « prêt » de l'exécution précédente)
+    state = {"offset": offset, "tail": ""}
+    def check():
+        try:
+            with open(path, "rb") as f:
+                f.seek(state["offset"]); chunk = f.read()
+        except OSError: return False
+        state["offset"] += len(chunk)
+        text = state["tail"] + chunk.decode("utf-8", "replace")
+        state["tail"] = text[-500:] # Une ligne coupée entre deux lectures reste détectable
+        return bool(pattern.search(text))
+    return check
+
+def service_checks(key, port=None, log_path=None, health_url=None, multi_process=False, log_offset=0):
+    if key in ("backend", "frontend"):
+        checks = [tcp_check(port)]
+        if key == "backend" and multi_process and log_path: checks.append(log_check(log_path, BACKEND_READY, log_offset))
+        if key == "backend" and health_url: checks.append(http_check(health_url))
+        return checks
+    if key in LOG_PATTERNS and log_path: return [log_check(log_path, LOG_PATTERNS[key], log_offset)]
+    return []
+
+def wait_ready(checks, is_alive, timeout=30, interval=0.1):
+    # Retourne (statut, durée en s) avec statut parmi "ready", "exited", "timeout"
+    started = time.monotonic()
+    pending = list(checks)
+    while True:
+        pending = [check for check in pending if not check()]
+        elapsed = round(time.monotonic() - started, 2)
+        if not pending: return "ready", elapsed
+        if not is_alive(): return "exited", elapsed
+        if elapsed >= timeout: return "timeout", elapsed
+        time.sleep(interval)
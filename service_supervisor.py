@@ -0,0 +1,98 @@
+# service_supervisor.py
+# Surveillance des services du lanceur dans un thread (sans interface graphique).
+# - Un service démarré depuis le lanceur est « surveillé » jusqu'à ce que l'opérateur l'arrête.
+# - Sortie détectée par process_state (fin du Popen : réveil immédiat ; PID repris : relevé périodique).
+# - Redémarrage avec attente exponentielle (1 s, 2 s, 4 s... 60 s max) ; abandon après MAX_RESTARTS
+#   redémarrages en RESTART_WINDOW secondes (service en boucle de plantage).
+# - Chaque changement est publié dans une queue.Queue lue par le thread Tk : (clé, événement, détail).
+#   Événements : "exited", "restarted", "restart_failed", "gave_up".
+
+import time
+import threading
+
+MAX_RESTARTS = 5
+RESTART_WINDOW = 300
+MAX_BACKOFF = 60
+STABLE_AFTER = 60 # Un service resté en marche aussi longtemps repart de l'attente minimale
+
+class ServiceSupervisor:
+    def __init__(self, tracker, spawn, events, interval=1.0):
+        # `spawn(clé)` relance le service et retourne True en cas de succès ; appelé depuis le thread de surveillance
+        self.tracker = tracker; self.spawn = spawn; self.events = events; self.interval = interval
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._stats = {}
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True); self._thread.start()
+
+    def stop(self):
+        self._stopping = True; self._wake.set()
+
+    def notify_exit(self, key, code):
+        # À brancher sur ProcessTracker(on_exit=...) : évite d'attendre le prochain relevé
+        with self._lock:
+            if key in self._stats: self._stats[key]["last_exit_code"] = code
+        self._wake.set()
+
+    def watch(self, key):
+        with self._lock:
+            stats = self._stats.setdefault(key, {"restarts": 0, "last_exit_code": None, "history": [], "failures": 0})
+            stats.update({"watched": True, "gave_up": False, "started_at": time.time(), "restart_at": None})
+
+    def unwatch(self, key):
+        with self._lock:
+            if key in self._stats: self._stats[key].update({"watched": False, "restart_at": None})
+
+    def stats(self, key):
+        with self._lock:
+            stats = dict(self._stats.get(key) or {})
+        if stats.get("watched") and stats.get("restart_at") is None and self.tracker.is_running(key):
+            stats["uptime_s"] = round(time.time() - stats["started_at"])
+        return stats
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait(self.interval); self._wake.clear()
+            if self._stopping: return
+            self.tracker.refresh()
+            with self._lock: watched = [key for key, stats in self._stats.items() if stats["watched"] and not stats["gave_up"]]
+            for key in watched: self._check(key)
+
+    def _check(self, key):
+        now = time.time()
+        if self.tracker.is_running(key): return
+        with self._lock:
+            stats = self._stats[key]
+            if not stats["watched"]: return
+            if stats["restart_at"] is None:
+                # Nouvelle sortie : planifie le redémarrage (ou abandonne si le service plante en boucle)
+                if now - stats["started_at"] >= STABLE_AFTER: stats["failures"] = 0
+                code = self.tracker.exit_code(key)
+                if code is not None: stats["last_exit_code"] = code
+                stats["history"] = [t for t in stats["history"] if now - t < RESTART_WINDOW]
+                if len(stats["history"]) >= MAX_RESTARTS:
+                    stats["gave_up"] = True
+                    event = (key, "gave_up", f"{len(stats['history'])} redémarrages en {RESTART_WINDOW} s, dernier code {stats['last_exit_code']}")
+                else:
+                    delay = min(MAX_BACKOFF, 2 ** stats["failures"])
+                    stats["restart_at"] = now + delay
+                    event = (key, "exited", f"code {stats['last_exit_code']}, redémarrage dans {delay} s")
+                self.events.put(event)
+                return
+            if now < stats["restart_at"]: return
+            stats["restart_at"] = None; stats["failures"] += 1; stats["history"].append(now)
+        try: ok = self.spawn(key)
+        except Exception as e: ok, error = False, e
+        else: error = None
+        with self._lock:
+            stats = self._stats[key]
+            if ok:
+                stats["restarts"] += 1; stats["started_at"] = time.time()
+                self.events.put((key, "restarted", f"redémarrage n° {stats['restarts']}"))
+            else:
+                stats["started_at"] = now
+                self.events.put((key, "restart_failed", str(error or "échec du lancement")))
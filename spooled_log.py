@@ -0,0 +1,172 @@
+# spooled_log.py
+# Zone de log commune aux trois outils (prérequis, installateur, lanceur).
+# - Chaque ligne est écrite dans un fichier de spool sur disque.
+# - Le widget ne conserve que les dernières lignes ; les plus anciennes sont relues depuis le spool
+#   lorsque l'utilisateur remonte en haut de la zone, puis libérées en redescendant.
+# - write() et clear() peuvent être appelés depuis n'importe quel thread : les lignes sont insérées
+#   par lots depuis la boucle Tk.
+
+import tkinter as tk
+from tkinter import ttk
+import os
+import queue
+import tempfile
+
+# =============================================================================
+# Widget de log borné adossé à un fichier de spool
+# =============================================================================
+class SpooledLog(ttk.Frame):
+    BLOCK_LINES = 500  # Granularité des chargements/déchargements (et de l'index du spool)
+    FLUSH_MS = 50
+
+    def __init__(self, parent, max_lines=5000, spool_dir=None, spool_prefix="log_", **text_options):
+        super().__init__(parent)
+        text_options.setdefault("state", "disabled")
+        self.text = tk.Text(self, **text_options)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.text.yview)
+        self.text.config(yscrollcommand=self._on_yscroll)
+        self.scrollbar.pack(side="right", fill="y")
+        self.text.pack(side="left", fill="both", expand=True)
+
+        self.max_blocks = max(2, max_lines // self.BLOCK_LINES)
+        self.pending = queue.Queue()
+
+        fd, self.spool_path = tempfile.mkstemp(prefix=spool_prefix, suffix=".log", dir=spool_dir)
+        self._spool = os.fdopen(fd, "w+b")
+        self._reset_counters()
+
+        self._load_scheduled = False
+        self._flush_job = self.after(self.FLUSH_MS, self._flush)
+
+    def _reset_counters(self):
+        self._total = 0              # Nombre de lignes écrites dans le spool
+        self._spool_size = 0
+        self._block_offsets = []     # Offset (octets) du début de chaque bloc de BLOCK_LINES lignes
+        self._first_block = 0        # Premier bloc affiché dans le widget
+        self._end = 0                # Ligne (exclue) de fin de la fenêtre affichée
+
+    # --- API publique (thread-safe) -------------------------------------------
+    def write(self, text, tag=None):
+        self.pending.put((text, tag))
+
+    def clear(self):
+        self.pending.put(None)
+
+    def tag_configure(self, *args, **kwargs):
+        return self.text.tag_configure(*args, **kwargs)
+
+    def destroy(self):
+        try: self.after_cancel(self._flush_job)
+        except tk.TclError: pass
+        try:
+            self._spool.close()
+            os.remove(self.spool_path)
+        except OSError: pass
+        super().destroy()
+
+    # --- Écriture par lots depuis la boucle Tk ---------------------------------
+    def _flush(self):
+        segments = []
+        spooled = False
+        while True:
+            try: item = self.pending.get_nowait()
+            except queue.Empty: break
+            if item is None:
+                segments = []
+                self._clear_now()
+                continue
+            text, tag = item
+            spooled = True
+            live = self._end == self._total
+            for line in text.splitlines():
+                self._spool_line(line, tag)
+                if live: segments.extend((line + "\n", tag or ()))
+            if live: self._end = self._total
+
+        if spooled: self._spool.flush()
+        if segments:
+            at_bottom = self.text.yview()[1] >= 1.0
+            self._edit(lambda: self.text.insert("end-1c", *segments))
+            self._trim_top()
+            if at_bottom: self.text.see("end")
+        self._flush_job = self.after(self.FLUSH_MS, self._flush)
+
+    def _spool_line(self, line, tag):
+        if self._total % self.BLOCK_LINES == 0:
+            self._block_offsets.append(self._spool_size)
+        data = f"{tag or ''}\t{line.rstrip(chr(13))}\n".encode("utf-8", "replace")
+        self._spool.write(data)
+        self._spool_size += len(data)
+        self._total += 1
+
+    def _clear_now(self):
+        self._edit(lambda: self.text.delete("1.0", "end"))
+        self._spool.seek(0)
+        self._spool.truncate()
+        self._reset_counters()
+
+    def _edit(self, action):
+        self.text.config(state="normal")
+        action()
+        self.text.config(state="disabled")
+
+    # --- Fenêtre glissante ------------------------------------------------------
+    def _shown_lines(self):
+        return self._end - self._first_block * self.BLOCK_LINES
+
+    def _top_line(self):
+        return int(self.text.index("@0,0").split(".")[0])
+
+    def _trim_top(self):
+        excess_blocks = -(-(self._shown_lines() - self.max_blocks * self.BLOCK_LINES) // self.BLOCK_LINES)
+        if excess_blocks <= 0: return
+        removed = excess_blocks * self.BLOCK_LINES
+        top = self._top_line()
+        self._edit(lambda: self.text.delete("1.0", f"{removed + 1}.0"))
+        self._first_block += excess_blocks
+        self.text.yview(f"{max(1, top - removed)}.0")
+
+    def _trim_bottom(self):
+        new_end = (self._first_block + self.max_blocks) * self.BLOCK_LINES
+        if self._end <= new_end: return
+        keep = new_end - self._first_block * self.BLOCK_LINES
+        self._edit(lambda: self.text.delete(f"{keep + 1}.0", "end"))
+        self._end = new_end
+
+    def _read_block(self, block):
+        start = self._block_offsets[block]
+        stop = self._block_offsets[block + 1] if block + 1 < len(self._block_offsets) else self._spool_size
+        with open(self.spool_path, "rb") as f:
+            f.seek(start)
+            data = f.read(stop - start)
+        segments = []
+        for raw in data.decode("utf-8", "replace").splitlines():
+            tag, _, line = raw.partition("\t")
+            segments.extend((line + "\n", tag or ()))
+        return segments
+
+    def _on_yscroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if self._load_scheduled: return
+        if float(first) <= 0.0 and self._first_block > 0:
+            self._load_scheduled = True; self.after_idle(self._load_older)
+        elif float(last) >= 1.0 and self._end < self._total:
+            self._load_scheduled = True; self.after_idle(self._load_newer)
+
+    def _load_older(self):
+        self._load_scheduled = False
+        if self._first_block == 0: return
+        top = self._top_line()
+        segments = self._read_block(self._first_block - 1)
+        self._edit(lambda: self.text.insert("1.0", *segments))
+        self._first_block -= 1
+        self._trim_bottom()
+        self.text.yview(f"{top + self.BLOCK_LINES}.0")
+
+    def _load_newer(self):
+        self._load_scheduled = False
+        if self._end >= self._total: return
+        segments = self._read_block(self._end // self.BLOCK_LINES)
+        self._edit(lambda: self.text.insert("end-1c", *segments))
+        self._end += len(segments) // 2
+        self._trim_top()
@@ -0,0 +1,72 @@
+# startup_report.py
+# Mesure du temps de démarrage des assistants (imports, puis premier affichage de la fenêtre).
+# - Chaque démarrage ajoute une ligne JSON à un fichier de suivi (%TEMP%\bovo_startup.jsonl par défaut,
+#   ou le chemin de la variable BOVO_STARTUP_REPORT) avec le budget et un indicateur de dépassement.
+# - `python startup_report.py` résume ce fichier (médiane, p95, dépassements) pour chaque outil.
+#
+# Ce module est importé en tout premier par les assistants : il ne doit dépendre que de `time` et `os`.
+
+import os
+import time
+
+DEFAULT_BUDGET_MS = 1500
+
+def report_path():
+    return os.environ.get("BOVO_STARTUP_REPORT") or os.path.join(os.environ.get("TEMP", os.environ.get("TMPDIR", "/tmp")), "bovo_startup.jsonl")
+
+class StartupTimer:
+    def __init__(self, tool):
+        self.tool = tool
+        self.start = time.perf_counter()
+        self.marks = {}
+        try: self.budget_ms = int(os.environ.get("BOVO_STARTUP_BUDGET_MS", DEFAULT_BUDGET_MS))
+        except ValueError: self.budget_ms = DEFAULT_BUDGET_MS # Valeur invalide : le démarrage ne doit pas échouer pour autant
+
+    def mark(self, name):
+        self.marks[name] = round((time.perf_counter() - self.start) * 1000, 1)
+
+    def watch_first_paint(self, root):
+        # Premier <Map> de la fenêtre principale, puis fin des tâches d'affichage en attente
+        def on_map(event):
+            if event.widget is not root or "first_paint" in self.marks: return
+            root.after_idle(self._on_first_paint)
+        root.bind("<Map>", on_map, add="+")
+
+    def _on_first_paint(self):
+        self.mark("first_paint")
+        self.write()
+
+    def write(self):
+        import json
+        from datetime import datetime
+        total = self.marks.get("first_paint", max(self.marks.values(), default=0))
+        entry = {"tool": self.tool, "at": datetime.now().isoformat(timespec="seconds"), "marks_ms": self.marks,
+                 "budget_ms": self.budget_ms, "over_budget": total > self.budget_ms}
+        try:
+            with open(report_path(), "a", encoding="utf-8") as f: f.write(json.dumps(entry) + "\n")
+        except OSError: pass
+
+def summarize(path=None):
+    import json
+    runs = {}
+    try:
+        with open(path or report_path(), "r", encoding="utf-8") as f:
+            for line in f:
+                try: entry = json.loads(line)
+                except ValueError: continue
+                runs.setdefault(entry["tool"], []).append(entry)
+    except OSError:
+        return {}
+    summary = {}
+    for tool, entries in runs.items():
+        paints = sorted(e["marks_ms"].get("first_paint", 0) for e in entries)
+        imports = sorted(e["marks_ms"].get("imports", 0) for e in entries)
+        summary[tool] = {"runs": len(entries), "imports_median_ms": imports[len(imports) // 2],
+                         "first_paint_median_ms": paints[len(paints) // 2], "first_paint_p95_ms": paints[min(len(paints) - 1, int(len(paints) * 0.95))],
+                         "budget_ms": entries[-1]["budget_ms"], "over_budget_runs": sum(1 for e in entries if e["over_budget"])}
+    return summary
+
+if __name__ == "__main__":
+    import json
+    import sys
+    print(json.dumps(summarize(sys.argv[1] if len(sys.argv) > 1 else None), indent=2))
@@ -0,0 +1,229 @@
+# static_server.py
+# Serveur de production du frontend (frontend/dist), à la place de `python -m http.server`.
+# - Lancé par le lanceur avec le python du venv ; bibliothèque standard uniquement (brotli utilisé s'il est installé).
+# - Cache HTTP : fichiers Vite à empreinte (assets/nom-<hash>.js) en « immutable » pour un an, index.html revalidé
+#   à chaque chargement ; ETag / Last-Modified et réponses 304.
+# - Compression : variantes .br / .gz précompressées servies selon Accept-Encoding ; à défaut, créées à la première
+#   demande (à côté du fichier, sinon gardées en mémoire).
+# - Petits fichiers gardés en mémoire (LRU) ; gros fichiers envoyés par socket.sendfile (sans copie sous Linux).
+# - Route inconnue sans extension -> index.html (routage côté client de l'application).
+# - Pas de log par requête (seulement les erreurs), sauf avec --access-log.
+#
+# Utilisation :
+#   venv\Scripts\python.exe static_server.py --root frontend\dist --port 3000
+
+import os
+import re
+import sys
+import threading
+import mimetypes
+import posixpath
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+# Nom produit par Vite dans assets/ : index-B3xk9aQz.js (empreinte de 8 caractères, au moins un chiffre ou une majuscule)
+ASSETS_DIR = "assets"
+HASHED_ASSET = re.compile(r"-(?=[A-Za-z0-9_-]*[0-9A-Z_])[A-Za-z0-9_-]{8}\.[a-z0-9]+$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+DEFAULT_CACHE = "public, max-age=3600"
+COMPRESSIBLE = ("text/", "application/javascript", "application/json", "application/xml", "image/svg+xml", "application/wasm", "application/manifest+json")
+MIN_COMPRESS_SIZE = 1024
+MEMORY_FILE_LIMIT = 256 * 1024
+MEMORY_BUDGET = 64 * 1024 * 1024
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+ETAG_SUFFIXES = {"br": "-br", "gzip": "-gz"}
+
+mimetypes.add_type("application/javascript", ".js")
+mimetypes.add_type("application/javascript", ".mjs")
+mimetypes.add_type("application/wasm", ".wasm")
+mimetypes.add_type("image/svg+xml", ".svg")
+mimetypes.add_type("application/manifest+json", ".webmanifest")
+
+# =============================================================================
+# Cache mémoire (LRU, borné en octets)
+# =============================================================================
+class ByteLRU:
+    def __init__(self, budget):
+        self.budget = budget; self.size = 0
+        self._items = OrderedDict(); self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None: self._items.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        if len(value) > self.budget: return
+        with self._lock:
+            if key in self._items: self.size -= len(self._items.pop(key))
+            self._items[key] = value; self.size += len(value)
+            while self.size > self.budget: self.size -= len(self._items.popitem(last=False)[1])
+
+# =============================================================================
+# Compression
+# =============================================================================
+def compress(data, encoding):
+    if encoding == "br":
+        import brotli
+        return brotli.compress(data)
+    import gzip
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+def available_encodings():
+    try: import brotli  # noqa: F401
+    except ImportError: return ("gzip",)
+    return ("br", "gzip")
+
+def accepted_encodings(header):
+    accepted = set()
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        if name and not re.search(r"q=0(\.0*)?\s*$", params): accepted.add(name.strip().lower())
+    return accepted
+
+# =============================================================================
+# Requêtes
+# =============================================================================
+class StaticHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Connexions persistantes (Content-Length toujours envoyé)
+    server_version = "BOVOStatic"
+
+    def version_string(self): return self.server_version
+
+    def log_message(self, format, *args):
+        if self.server.access_log: super().log_message(format, *args)
+
+    def log_error(self, format, *args):
+        super().log_message(format, *args)
+
+    def do_HEAD(self): self.serve(head=True)
+    def do_GET(self): self.serve(head=False)
+
+    def resolve(self):
+        # Chemin sur disque (dans la racine), ou index.html pour une route de l'application ; None si introuvable
+        root = self.server.root
+        path = posixpath.normpath(unquote(urlsplit(self.path).path))
+        parts = [part for part in path.split("/") if part and part not in (".", "..")]
+        # Comme SimpleHTTPRequestHandler.translate_path : pas de séparateur Windows ni de lecteur dans un segment
+        if any(os.sep in part or (os.altsep and os.altsep in part) or ":" in part for part in parts): return None
+        candidate = os.path.realpath(os.path.join(root, *parts))
+        if os.path.commonpath([root, candidate]) != root: return None
+        if os.path.isdir(candidate): candidate = os.path.join(candidate, "index.html")
+        if os.path.isfile(candidate): return candidate
+        if not posixpath.splitext(path)[1]: return os.path.join(root, "index.html") if os.path.isfile(os.path.join(root, "index.html")) else None
+        return None
+
+    def variant(self, path, stat, content_type):
+        # Retourne (chemin ou None, contenu ou None, encodage ou None) de la meilleure variante acceptée par le client
+        accepted = accepted_encodings(self.headers.get("Accept-Encoding"))
+        if not content_type.startswith(COMPRESSIBLE) or stat.st_size < MIN_COMPRESS_SIZE: return path, None, None
+        for encoding, suffix in ENCODINGS:
+            if encoding not in accepted: continue
+            try:
+                if os.stat(path + suffix).st_mtime_ns >= stat.st_mtime_ns: return path + suffix, None, encoding
+            except OSError: pass
+        for encoding in available_encodings():
+            if encoding not in accepted: continue
+            return self.server.compressed(path, stat, encoding)
+        return path, None, None
+
+    def serve(self, head):
+        path = self.resolve()
+        if path is None:
+            self.send_error(404, "Fichier introuvable"); return
+        stat = os.stat(path)
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        if content_type.startswith("text/") or content_type == "application/javascript": content_type += "; charset=utf-8"
+        name = os.path.basename(path)
+        hashed = os.path.dirname(path) == os.path.join(self.server.root, ASSETS_DIR) and HASHED_ASSET.search(name)
+        cache_control = REVALIDATE if name == "index.html" else IMMUTABLE if hashed else DEFAULT_CACHE
+        body_path, body, encoding = self.variant(path, stat, content_type)
+        # Une ETag par représentation : la variante compressée n'a pas les mêmes octets que le fichier
+        etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}{ETAG_SUFFIXES.get(encoding, "")}"'
+
+        if self.not_modified(etag, stat.st_mtime):
+            self.send_response(304)
+            for header, value in (("ETag", etag), ("Cache-Control", cache_control), ("Vary", "Accept-Encoding")): self.send_header(header, value)
+            self.end_headers(); return
+
+        size = len(body) if body is not None else os.stat(body_path).st_size
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(size))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", formatdate(stat.st_mtime, usegmt=True))
+        self.send_header("Cache-Control", cache_control)
+        self.send_header("Vary", "Accept-Encoding")
+        if encoding: self.send_header("Content-Encoding", encoding)
+        self.end_headers()
+        if head: return
+        if body is None and size <= MEMORY_FILE_LIMIT: body = self.server.small_file(body_path)
+        if body is not None:
+            self.wfile.write(body); return
+        self.wfile.flush()
+        with open(body_path, "rb") as f: self.connection.sendfile(f)
+
+    def not_modified(self, etag, mtime):
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            return if_none_match.strip() == "*" or etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try: return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError): return False
+        return False
+
+class StaticServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, root, access_log=False):
+        super().__init__(address, StaticHandler)
+        self.root = os.path.realpath(root); self.access_log = access_log
+        self.memory = ByteLRU(MEMORY_BUDGET)
+
+    def small_file(self, path):
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        data = self.memory.get(key)
+        if data is None:
+            with open(path, "rb") as f: data = f.read()
+            self.memory.put(key, data)
+        return data
+
+    def compressed(self, path, stat, encoding):
+        # Variante créée à la première demande : écrite à côté du fichier (dossier en lecture seule : gardée en mémoire)
+        key = (path, stat.st_mtime_ns, stat.st_size, encoding)
+        data = self.memory.get(key)
+        if data is not None: return path, data, encoding
+        with open(path, "rb") as f: data = compress(f.read(), encoding)
+        target = path + dict(ENCODINGS)[encoding]
+        try:
+            temporary = f"{target}.{threading.get_ident()}.tmp"
+            with open(temporary, "wb") as f: f.write(data)
+            os.utime(temporary, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            os.replace(temporary, target)
+        except OSError: pass
+        self.memory.put(key, data)
+        return path, data, encoding
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Serveur de fichiers statiques du frontend.")
+    parser.add_argument("--root", default=".", help="Dossier à servir (frontend/dist)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=3000)
+    parser.add_argument("--access-log", action="store_true", help="Journalise chaque requête")
+    args = parser.parse_args(argv)
+    server = StaticServer((args.host, args.port), args.root, args.access_log)
+    print(f"Frontend servi depuis {server.root} sur {args.host}:{args.port}", flush=True)
+    try: server.serve_forever()
+    except KeyboardInterrupt: pass
+    finally: server.server_close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+# Cache local de paquets : préparation depuis un flux « dossier » (paquets factices), puis vérification
+import io
+import json
+import os
+import zipfile
+
+import pytest
+
+from choco_tools import prefetch_packages, load_manifest, local_bootstrap_command, fetch_package, read_nupkg, MANIFEST_NAME
+
+def make_nupkg(package_id, version, dependencies=(), script=False, embedded=False):
+    deps = "".join(f'<dependency id="{dep_id}" version="[{dep_version}]" />' for dep_id, dep_version in dependencies)
+    nuspec = (f'<?xml version="1.0"?><package><metadata><id>{package_id}</id><version>{version}</version>'
+              f'<dependencies>{deps}</dependencies></metadata></package>')
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr(f"{package_id}.nuspec", nuspec)
+        if script: archive.writestr("tools/chocolateyInstall.ps1", "Install-ChocolateyPackage ...")
+        if embedded: archive.writestr(f"tools/{package_id}.exe", b"MZ")
+    return buffer.getvalue()
+
+@pytest.fixture
+def feed(tmp_path):
+    folder = tmp_path / "feed"
+    folder.mkdir()
+    packages = [make_nupkg("chocolatey", "2.2.2"), make_nupkg("chocolatey", "1.4.0"),
+                make_nupkg("git", "2.45.1", dependencies=[("git.install", "2.45.1")]),
+                make_nupkg("git.install", "2.45.1", script=True, embedded=True), make_nupkg("git.install", "2.40.0", script=True, embedded=True),
+                make_nupkg("vscode", "1.90.0", script=True)]
+    for data in packages:
+        package_id, version, _, _ = read_nupkg(data)
+        (folder / f"{package_id}.{version}.nupkg").write_bytes(data)
+    return str(folder)
+
+def prefetch(cache_dir, feed):
+    return prefetch_packages(str(cache_dir), ["chocolatey", "git", "vscode"], feed=feed, bootstrap_url="https://example.invalid/install.ps1",
+                             fetch=lambda url: b"# install.ps1", log=lambda message: None)
+
+def test_fetch_package_from_directory_feed(feed):
+    assert read_nupkg(fetch_package(feed, "chocolatey"))[1] == "2.2.2"
+    assert read_nupkg(fetch_package(feed, "git.install", "2.40.0"))[1] == "2.40.0"
+    with pytest.raises(FileNotFoundError):
+        fetch_package(feed, "nodejs-lts")
+
+def test_prefetch_follows_exact_dependencies(tmp_path, feed):
+    manifest = prefetch(tmp_path / "cache", feed)
+    assert set(manifest["packages"]) == {"chocolatey", "git", "git.install", "vscode"}
+    assert manifest["packages"]["git.install"]["version"] == "2.45.1"
+    assert manifest["packages"]["git"]["dependencies"] == ["git.install"]
+    # Script d'installation sans binaire embarqué : l'installeur sera téléchargé à l'installation
+    assert manifest["packages"]["vscode"]["downloads_at_install"] is True
+    assert manifest["packages"]["git.install"]["downloads_at_install"] is False
+    assert manifest["bootstrap"]["file"] == "install.ps1"
+
+def test_load_manifest_verifies_hashes(tmp_path, feed):
+    cache = tmp_path / "cache"
+    prefetch(cache, feed)
+    assert set(load_manifest(str(cache), verify=True)["packages"]) == {"chocolatey", "git", "git.install", "vscode"}
+    (cache / "vscode.1.90.0.nupkg").write_bytes(b"corrompu")
+    with pytest.raises(ValueError, match="vscode.1.90.0.nupkg"):
+        load_manifest(str(cache), verify=True)
+    load_manifest(str(cache), verify=False)
+
+@pytest.mark.parametrize("remove", ["chocolatey", "bootstrap"])
+def test_incomplete_manifest_is_rejected(tmp_path, feed, remove):
+    cache = tmp_path / "cache"
+    manifest = prefetch(cache, feed)
+    if remove == "bootstrap": del manifest["bootstrap"]
+    else: del manifest["packages"][remove]
+    (cache / MANIFEST_NAME).write_text(json.dumps(manifest), encoding="utf-8")
+    with pytest.raises(ValueError, match="Préparez à nouveau le cache"):
+        load_manifest(str(cache), verify=False)
+    with pytest.raises(ValueError):
+        local_bootstrap_command(str(cache))
+
+def test_local_bootstrap_command_uses_cached_files(tmp_path, feed):
+    cache = tmp_path / "cache"
+    prefetch(cache, feed)
+    command = local_bootstrap_command(str(cache))
+    assert os.path.abspath(str(cache / "chocolatey.2.2.2.nupkg")) in command
+    assert os.path.abspath(str(cache / "install.ps1")) in command
@@ -0,0 +1,63 @@
+# Wheelhouse Python : construction hors ligne (--find-links vers un dossier local) et réutilisation
+import base64
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import zipfile
+
+import pytest
+
+from dependency_cache import wheelhouse_path, wheelhouse_ready, build_wheelhouse, WHEELHOUSE_MARKER
+
+def make_wheel(folder, name, version):
+    # Roue minimale (pur Python) : module vide + dist-info
+    dist_info = f"{name}-{version}.dist-info"
+    files = {f"{name}.py": b"",
+             f"{dist_info}/METADATA": f"Metadata-Version: 2.1\nName: {name.replace('_', '-')}\nVersion: {version}\n".encode(),
+             f"{dist_info}/WHEEL": b"Wheel-Version: 1.0\nGenerator: test\nRoot-Is-Purelib: true\nTag: py3-none-any\n"}
+    record = "".join(f"{path},sha256={base64.urlsafe_b64encode(hashlib.sha256(data).digest()).rstrip(b'=').decode()},{len(data)}\n" for path, data in files.items())
+    path = os.path.join(folder, f"{name}-{version}-py3-none-any.whl")
+    with zipfile.ZipFile(path, "w") as archive:
+        for name_in_archive, data in files.items(): archive.writestr(name_in_archive, data)
+        archive.writestr(f"{dist_info}/RECORD", record + f"{dist_info}/RECORD,,\n")
+    return os.path.basename(path)
+
+def run(command, description=None):
+    subprocess.run(command, shell=True, check=True, capture_output=True)
+
+@pytest.fixture
+def project(tmp_path):
+    links = tmp_path / "links"
+    links.mkdir()
+    wheel = make_wheel(str(links), "bovo_stub", "1.0")
+    requirements = tmp_path / "requirements.txt"
+    requirements.write_text("bovo-stub==1.0\n", encoding="utf-8")
+    return {"links": str(links), "wheel": wheel, "requirements": str(requirements), "root": str(tmp_path / "wheelhouse")}
+
+def test_wheelhouse_path_follows_requirements(project, tmp_path):
+    path = wheelhouse_path(project["requirements"], sys.executable, project["root"])
+    assert os.path.dirname(path) == project["root"]
+    assert sys.implementation.cache_tag in os.path.basename(path)
+    assert wheelhouse_path(project["requirements"], sys.executable, project["root"]) == path
+    other = tmp_path / "other.txt"
+    other.write_text("bovo-stub==2.0\n", encoding="utf-8")
+    assert wheelhouse_path(str(other), sys.executable, project["root"]) != path
+
+def test_build_from_local_find_links(project):
+    path = build_wheelhouse(project["requirements"], sys.executable, project["root"], find_links=project["links"], run=run)
+    assert wheelhouse_ready(path)
+    with open(os.path.join(path, WHEELHOUSE_MARKER), encoding="utf-8") as f:
+        assert json.load(f)["wheels"] == [project["wheel"]]
+    # Dossier temporaire de construction supprimé ; wheelhouse existant réutilisé sans relancer pip
+    assert os.listdir(project["root"]) == [os.path.basename(path)]
+    def fail(command, description=None): raise AssertionError("pip relancé")
+    assert build_wheelhouse(project["requirements"], sys.executable, project["root"], find_links=project["links"], run=fail) == path
+
+def test_failed_build_leaves_no_wheelhouse(project, tmp_path):
+    requirements = tmp_path / "missing.txt"
+    requirements.write_text("bovo-absent==1.0\n", encoding="utf-8")
+    with pytest.raises(subprocess.CalledProcessError):
+        build_wheelhouse(str(requirements), sys.executable, project["root"], find_links=project["links"], run=run)
+    assert os.listdir(project["root"]) == []
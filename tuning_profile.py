@@ -0,0 +1,102 @@
+# tuning_profile.py
+# Profil de performance dimensionné selon la machine (processeurs, mémoire) et la base de données.
+# - L'installateur le calcule, le propose sur la page de configuration puis l'écrit dans backend/.env.
+# - Le lanceur le relit dans .env pour construire les commandes Waitress et Celery.
+# - Le total des connexions PostgreSQL (threads Waitress + concurrence Celery + beat + marge) reste
+#   dans la limite disponible sur le serveur (pré-vérification de ConfigPage), à défaut dans celle d'un
+#   serveur aux réglages par défaut.
+# - connections_needed() est la seule définition de ce total (reprise par db_tools.planned_connections).
+
+import os
+
+# Moteurs du service backend (lancer_application_gui.get_command) :
+#   waitress  : un processus Waitress (limité à environ un cœur par le GIL)
+#   processes : backend_server.py, BACKEND_WORKERS processus Waitress partageant le même port
+#   uvicorn   : serveur ASGI avec BACKEND_WORKERS processus (si le projet fournit core/asgi.py)
+BACKEND_ENGINES = ("waitress", "processes", "uvicorn")
+# Serveur du frontend : static (static_server.py : cache HTTP, compression, mémoire) ou http.server (ancien mode)
+FRONTEND_SERVERS = ("static", "http.server")
+PROFILE_CHOICES = {"BACKEND_ENGINE": BACKEND_ENGINES, "FRONTEND_SERVER": FRONTEND_SERVERS}
+
+# Clé .env -> (valeur par défaut, description) ; le type de la valeur par défaut est celui de la clé
+PROFILE_KEYS = {
+    "BACKEND_ENGINE": ("waitress", "Moteur du backend"),
+    "BACKEND_WORKERS": (1, "Processus du backend"),
+    "WAITRESS_THREADS": (4, "Threads Waitress (par processus)"),
+    "WAITRESS_CONNECTION_LIMIT": (100, "Connexions HTTP simultanées (Waitress)"),
+    "WAITRESS_BACKLOG": (1024, "File d'attente TCP (backlog)"),
+    "WAITRESS_CHANNEL_TIMEOUT": (120, "Délai d'inactivité d'une connexion (s)"),
+    "CELERY_WORKER_CONCURRENCY": (4, "Concurrence du worker Celery"),
+    "CELERY_WORKER_PREFETCH_MULTIPLIER": (1, "Préchargement des tâches Celery"),
+    "DJANGO_CONN_MAX_AGE": (60, "Durée de vie des connexions Django (s)"),
+    "FRONTEND_SERVER": ("static", "Serveur du frontend"),
+}
+BEAT_CONNECTIONS = 1
+RESERVED_CONNECTIONS = 2  # Marge pour l'administration (psql, migrations...)
+# Serveur non vérifié : valeurs par défaut de PostgreSQL (max_connections = 100, superuser_reserved_connections = 3)
+DEFAULT_AVAILABLE_CONNECTIONS = 100 - 3
+LOW_MEMORY_BYTES = 4 * 1024 ** 3
+
+def detect_hardware():
+    cpu = os.cpu_count() or 1
+    ram = None
+    if os.name == "nt":
+        import ctypes
+        class MEMORYSTATUSEX(ctypes.Structure):
+            _fields_ = [("dwLength", ctypes.c_ulong), ("dwMemoryLoad", ctypes.c_ulong), ("ullTotalPhys", ctypes.c_ulonglong),
+                        ("ullAvailPhys", ctypes.c_ulonglong), ("ullTotalPageFile", ctypes.c_ulonglong), ("ullAvailPageFile", ctypes.c_ulonglong),
+                        ("ullTotalVirtual", ctypes.c_ulonglong), ("ullAvailVirtual", ctypes.c_ulonglong), ("ullAvailExtendedVirtual", ctypes.c_ulonglong)]
+        status = MEMORYSTATUSEX(); status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)): ram = status.ullTotalPhys
+    else:
+        try: ram = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+        except (ValueError, OSError, AttributeError): pass
+    return {"cpu": cpu, "ram_bytes": ram}
+
+def web_connections(profile):
+    # Une connexion PostgreSQL par thread de chaque processus du backend
+    workers = profile["BACKEND_WORKERS"] if profile["BACKEND_ENGINE"] != "waitress" else 1
+    return profile["WAITRESS_THREADS"] * workers
+
+def connections_needed(profile):
+    return web_connections(profile) + profile["CELERY_WORKER_CONCURRENCY"] + BEAT_CONNECTIONS + RESERVED_CONNECTIONS
+
+def build_profile(cpu, ram_bytes=None, available_connections=None):
+    # À partir de 4 cœurs, plusieurs processus (un par cœur, 8 au plus) de 4 threads ; sinon un seul processus
+    workers = min(8, cpu) if cpu >= 4 else 1
+    threads = 4 if workers > 1 else min(32, max(4, cpu * 2))
+    concurrency = min(64, max(2, cpu * 4)) # Pool eventlet : une connexion PostgreSQL par tâche en cours
+    if ram_bytes and ram_bytes < LOW_MEMORY_BYTES: concurrency = max(2, concurrency // 2); workers = min(workers, 2)
+    profile = {"BACKEND_ENGINE": "processes" if workers > 1 else "waitress", "BACKEND_WORKERS": workers,
+               "WAITRESS_THREADS": threads, "WAITRESS_CONNECTION_LIMIT": 100, "WAITRESS_BACKLOG": 1024, "WAITRESS_CHANNEL_TIMEOUT": 120,
+               "CELERY_WORKER_CONCURRENCY": concurrency, "CELERY_WORKER_PREFETCH_MULTIPLIER": 1, "DJANGO_CONN_MAX_AGE": 60,
+               "FRONTEND_SERVER": "static"}
+    if available_connections is None: available_connections = DEFAULT_AVAILABLE_CONNECTIONS
+    # Réduit d'abord Celery, puis les threads, puis les processus, jusqu'à tenir dans les connexions disponibles
+    excess = connections_needed(profile) - available_connections
+    reduction = min(max(0, excess), profile["CELERY_WORKER_CONCURRENCY"] - 1)
+    profile["CELERY_WORKER_CONCURRENCY"] -= reduction
+    while connections_needed(profile) > available_connections and profile["WAITRESS_THREADS"] > 2: profile["WAITRESS_THREADS"] -= 1
+    while connections_needed(profile) > available_connections and profile["BACKEND_WORKERS"] > 1: profile["BACKEND_WORKERS"] -= 1
+    if profile["BACKEND_WORKERS"] == 1: profile["BACKEND_ENGINE"] = "waitress"
+    while connections_needed(profile) > available_connections and profile["WAITRESS_THREADS"] > 1: profile["WAITRESS_THREADS"] -= 1
+    # Connexions HTTP en attente d'un thread : au-delà, Waitress cesse d'accepter (plutôt que d'empiler la latence)
+    profile["WAITRESS_CONNECTION_LIMIT"] = max(100, profile["WAITRESS_THREADS"] * 25)
+    return profile
+
+def read_profile(env):
+    # `env` : variables du .env (dict) ; valeurs absentes ou invalides -> valeur par défaut
+    profile = {}
+    for key, (default, _) in PROFILE_KEYS.items():
+        try: profile[key] = type(default)(str(env.get(key, default)).strip().strip("'\""))
+        except ValueError: profile[key] = default
+    for key, choices in PROFILE_CHOICES.items():
+        if profile[key] not in choices: profile[key] = PROFILE_KEYS[key][0]
+    return profile
+
+def profile_env_lines(profile, hardware=None):
+    lines = ["# --- Profil de performance (modifiable ; relu par le lanceur) ---"]
+    if hardware: lines.append(f"# Machine : {hardware['cpu']} processeur(s), {round((hardware['ram_bytes'] or 0) / 1024 ** 3, 1)} Go de RAM")
+    # DJANGO_CONN_MAX_AGE n'a d'effet que si les réglages du backend le lisent (DATABASES['default']['CONN_MAX_AGE'])
+    lines.extend(f"{key}={profile[key]}" for key in PROFILE_KEYS)
+    return "\n".join(lines)